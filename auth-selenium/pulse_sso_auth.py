@@ -14,6 +14,7 @@ Output formats:
 """
 
 import argparse
+import asyncio
 import hashlib
 import json
 import os
@@ -21,20 +22,81 @@ import re
 import shutil
 import socket
 import ssl
+import struct
 import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
 from urllib.parse import urlparse
+from urllib.request import urlopen
+
+# selenium and xdg_base_dirs are imported where they are used so that
+# --help and argument errors don't pay for loading them.
+
+# Bot-detection evasion injected into every document before page scripts run.
+# Masks the WebDriver-specific properties that Cloudflare/Okta fingerprint.
+STEALTH_JS = """
+Object.defineProperty(Navigator.prototype, 'webdriver', {get: () => undefined});
+Object.defineProperty(Navigator.prototype, 'languages', {get: () => ['en-US', 'en']});
+Object.defineProperty(Navigator.prototype, 'vendor', {get: () => 'Google Inc.'});
+Object.defineProperty(Navigator.prototype, 'platform', {get: () => 'Win32'});
+window.chrome = window.chrome || {};
+window.chrome.runtime = window.chrome.runtime || {};
+for (const ctx of [WebGLRenderingContext, window.WebGL2RenderingContext].filter(Boolean)) {
+    const getParameter = ctx.prototype.getParameter;
+    ctx.prototype.getParameter = function (parameter) {
+        if (parameter === 37445) return 'Intel Inc.';                  // UNMASKED_VENDOR_WEBGL
+        if (parameter === 37446) return 'Intel Iris OpenGL Engine';    // UNMASKED_RENDERER_WEBGL
+        return getParameter.call(this, parameter);
+    };
+}
+"""
+
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium_stealth import stealth
-from xdg_base_dirs import xdg_config_home
-import undetected_chromedriver as uc
+def _cached_which(names: list[str]) -> str | None:
+    """
+    Resolve the first of names found in PATH, caching the result on disk.
+
+    Binary locations are stable for a given PATH (on NixOS the wrapper pins
+    them), so the lookup is cached in $XDG_CACHE_HOME/pulse-sso-auth/paths.json
+    keyed by a hash of PATH. A cached entry whose file no longer exists is
+    treated as a miss.
+    """
+    from xdg_base_dirs import xdg_cache_home
+
+    path_hash = hashlib.blake2b(os.environ.get("PATH", "").encode(), digest_size=8).hexdigest()
+    key = f"{path_hash}:{','.join(names)}"
+    cache_file = os.path.join(xdg_cache_home(), "pulse-sso-auth", "paths.json")
+
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+        if not isinstance(cache, dict):
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+
+    cached = cache.get(key)
+    if cached and os.path.exists(cached):
+        return cached
+
+    for name in names:
+        path = shutil.which(name)
+        if path:
+            cache[key] = path
+            try:
+                os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+                with open(cache_file, "w") as f:
+                    json.dump(cache, f)
+            except OSError as e:
+                print(f"Warning: Could not write {cache_file}: {e}", file=sys.stderr)
+            return path
+    return None
 
 
 def find_chromedriver() -> str | None:
     """Find chromedriver in PATH."""
-    return shutil.which("chromedriver")
+    return _cached_which(["chromedriver"])
 
 
 def find_chromium() -> str | None:
@@ -45,29 +107,204 @@ def find_chromium() -> str | None:
     The Nix wrapper adds it to PATH, so we find it there and explicitly tell
     Selenium where it is via binary_location.
     """
-    for name in ["chromium", "chromium-browser", "google-chrome", "chrome"]:
-        path = shutil.which(name)
-        if path:
-            return path
+    return _cached_which(["chromium", "chromium-browser", "google-chrome", "chrome"])
+
+
+# TLS 1.2 cipher suites offered by the probe ClientHello: ECDHE/RSA with
+# AES-GCM, ChaCha20 and AES-CBC, enough for any gateway that still speaks 1.2.
+_TLS12_CIPHER_SUITES = bytes.fromhex(
+    "c02fc02bc030c02ccca8cca9009c009dc013c014002f0035"
+)
+_TLS12_SIGNATURE_ALGORITHMS = bytes.fromhex("040305030603080408050806040105010601")
+
+
+# Shared context for the fallback handshake. The certificate is only hashed,
+# never verified, so no CA bundle is loaded and the context is cheap to keep.
+_CERT_CTX = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+_CERT_CTX.check_hostname = False
+_CERT_CTX.verify_mode = ssl.CERT_NONE
+
+
+def _tls_vector(data: bytes, length_bytes: int) -> bytes:
+    """Prefix data with its big-endian length, as TLS vectors are encoded."""
+    return len(data).to_bytes(length_bytes, "big") + data
+
+
+def _build_client_hello(hostname: str) -> bytes:
+    """Build a minimal TLS 1.2 ClientHello record with SNI for hostname."""
+    server_name = _tls_vector(b"\x00" + _tls_vector(hostname.encode("idna"), 2), 2)
+    extensions = b"".join(
+        ext_type + _tls_vector(ext_data, 2)
+        for ext_type, ext_data in (
+            (b"\x00\x00", server_name),
+            (b"\x00\x0a", _tls_vector(bytes.fromhex("001d00170018"), 2)),  # groups
+            (b"\x00\x0b", b"\x01\x00"),  # ec_point_formats: uncompressed
+            (b"\x00\x0d", _tls_vector(_TLS12_SIGNATURE_ALGORITHMS, 2)),
+            (b"\x00\x17", b""),  # extended_master_secret
+            (b"\xff\x01", b"\x00"),  # renegotiation_info
+        )
+    )
+    body = (
+        b"\x03\x03"  # client_version: TLS 1.2
+        + os.urandom(32)
+        + b"\x00"  # empty session_id
+        + _tls_vector(_TLS12_CIPHER_SUITES, 2)
+        + b"\x01\x00"  # compression: null only
+        + _tls_vector(extensions, 2)
+    )
+    handshake = b"\x01" + _tls_vector(body, 3)
+    return b"\x16\x03\x01" + _tls_vector(handshake, 2)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes from sock."""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed during TLS handshake")
+        buf += chunk
+    return bytes(buf)
+
+
+def _read_tls12_certificate(sock: socket.socket, hostname: str) -> bytes | None:
+    """
+    Send a TLS 1.2 ClientHello and return the server's leaf certificate (DER).
+
+    In TLS 1.2 the Certificate handshake message is sent in the clear right
+    after ServerHello, so the handshake can be abandoned as soon as it arrives:
+    no key exchange, no Finished round trip. Returns None if the server answers
+    with an alert or anything unexpected (e.g. it only speaks TLS 1.3).
+    """
+    sock.sendall(_build_client_hello(hostname))
+
+    handshake = b""
+    while len(handshake) < 65536:
+        content_type, _, length = struct.unpack(">BHH", _recv_exact(sock, 5))
+        fragment = _recv_exact(sock, length)
+        if content_type != 0x16:  # not a handshake record (alert, etc.)
+            return None
+        handshake += fragment
+
+        # Walk the complete handshake messages received so far
+        offset = 0
+        while offset + 4 <= len(handshake):
+            msg_type = handshake[offset]
+            msg_len = int.from_bytes(handshake[offset + 1:offset + 4], "big")
+            if offset + 4 + msg_len > len(handshake):
+                break
+            if msg_type == 0x0b:  # Certificate
+                msg = handshake[offset + 4:offset + 4 + msg_len]
+                cert_len = int.from_bytes(msg[3:6], "big")
+                cert_der = msg[6:6 + cert_len]
+                return cert_der if len(cert_der) == cert_len and cert_len else None
+            if msg_type != 0x02:  # only ServerHello may precede it
+                return None
+            offset += 4 + msg_len
     return None
 
 
+async def _race_connect(hostname: str, port: int) -> socket.socket:
+    """
+    Connect to hostname:port, racing all resolved addresses (RFC 8305).
+
+    Each address is tried 250 ms after the previous one without waiting for it
+    to fail, so a dead AAAA record no longer costs a full connect timeout.
+    The losing attempts are cancelled by asyncio.
+    """
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_connection(
+        asyncio.Protocol, hostname, port, happy_eyeballs_delay=0.25
+    )
+    try:
+        # Detach a plain socket from the transport for blocking use
+        return transport.get_extra_info("socket").dup()
+    finally:
+        transport.close()
+
+
+def _connect_gateway(hostname: str, port: int, timeout: float = 10) -> socket.socket:
+    """Open a blocking TCP connection to the gateway via _race_connect."""
+    sock = asyncio.run(asyncio.wait_for(_race_connect(hostname, port), timeout))
+    sock.settimeout(timeout)
+    return sock
+
+
 def get_server_cert_fingerprint(hostname: str, port: int = 443) -> str:
     """Get SHA256 fingerprint of server certificate for certificate pinning."""
-    context = ssl.create_default_context()
-    context.check_hostname = False
-    context.verify_mode = ssl.CERT_NONE
-
     try:
-        with socket.create_connection((hostname, port), timeout=10) as sock:
-            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                cert_der = ssock.getpeercert(binary_form=True)
-                return "sha256:" + hashlib.sha256(cert_der).hexdigest()
+        with _connect_gateway(hostname, port) as sock:
+            try:
+                cert_der = _read_tls12_certificate(sock, hostname)
+            except OSError:
+                cert_der = None  # e.g. reset on a TLS 1.2 ClientHello
+
+        if cert_der is None:
+            # No cleartext certificate (TLS 1.3-only gateway): fall back to a
+            # full handshake, whose certificate is only readable afterwards
+            with _connect_gateway(hostname, port) as sock:
+                with _CERT_CTX.wrap_socket(sock, server_hostname=hostname) as ssock:
+                    cert_der = ssock.getpeercert(binary_form=True)
+
+        return "sha256:" + hashlib.sha256(cert_der).digest().hex()
     except Exception as e:
         print(f"Warning: Could not get server certificate: {e}", file=sys.stderr)
         return ""
 
 
+# How long to wait for the background certificate probe once the cookie is
+# in hand. The probe started with the browser, so it normally finished long
+# ago; past this the cookie is delivered without a pinned certificate.
+GWCERT_WAIT_TIMEOUT = 15
+
+
+def start_gwcert_fetch(hostname: str) -> Future:
+    """
+    Fetch the gateway certificate fingerprint in the background.
+
+    Runs on a daemon thread so a stalled probe never holds up process exit.
+    """
+    future = Future()
+    threading.Thread(
+        target=lambda: future.set_result(get_server_cert_fingerprint(hostname)),
+        daemon=True,
+    ).start()
+    return future
+
+
+def gwcert_result(future: "Future | None") -> str:
+    """Result of start_gwcert_fetch, or "" if not fetched or still pending."""
+    if future is None:
+        return ""
+    try:
+        return future.result(timeout=GWCERT_WAIT_TIMEOUT)
+    except FuturesTimeoutError:
+        print(
+            f"Warning: Gateway certificate probe still running after "
+            f"{GWCERT_WAIT_TIMEOUT}s, continuing without it",
+            file=sys.stderr,
+        )
+        return ""
+
+
+def _ensure_profile_dir(path: str) -> None:
+    """Create the browser profile directory unless it already exists."""
+    # A bare stat is the common case; makedirs only runs on first use
+    try:
+        os.stat(path)
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
+
+# Lock files Chrome leaves in its profile directory after a crash
+CHROME_LOCK_FILES = frozenset((
+    "DevToolsActivePort",
+    "SingletonLock",
+    "SingletonSocket",
+    "SingletonCookie",
+))
+
+
 def cleanup_stale_chrome_locks(profile_dir: str) -> None:
     """
     Remove stale Chrome lock files that prevent new sessions.
@@ -75,21 +312,66 @@ def cleanup_stale_chrome_locks(profile_dir: str) -> None:
     Chrome leaves these files when it crashes or is killed without cleanup.
     Without removal, new sessions fail with "Could not remove old devtools port file".
     """
-    lock_files = [
-        "DevToolsActivePort",
-        "SingletonLock",
-        "SingletonSocket",
-        "SingletonCookie",
-    ]
-
-    for lock_file in lock_files:
-        path = os.path.join(profile_dir, lock_file)
-        try:
-            if os.path.exists(path):
-                os.remove(path)
-                print(f"Removed stale lock file: {path}", file=sys.stderr)
-        except OSError as e:
-            print(f"Warning: Could not remove {path}: {e}", file=sys.stderr)
+    try:
+        entries = os.scandir(profile_dir)
+    except OSError:
+        return  # Fresh profile, nothing to clean up
+
+    with entries:
+        for entry in entries:
+            if entry.name in CHROME_LOCK_FILES:
+                try:
+                    os.unlink(entry.path)
+                    print(f"Removed stale lock file: {entry.path}", file=sys.stderr)
+                except OSError as e:
+                    print(f"Warning: Could not remove {entry.path}: {e}", file=sys.stderr)
+
+
+# Matches a non-empty DSID in a CDP Set-Cookie header value, which holds one
+# cookie per line when the response sets several.
+DSID_SET_COOKIE_RE = re.compile(r"(?:^|\n)\s*DSID=([^;\s]+)")
+
+
+async def _wait_for_dsid_event(debugger_address: str, timeout: int, check_existing) -> str | None:
+    """
+    Wait for the response that sets DSID on the browser's CDP event stream.
+
+    Attaches a second DevTools client to the page target and watches
+    Network.responseReceivedExtraInfo, which carries the raw Set-Cookie
+    headers (including HttpOnly ones). check_existing is called once after
+    subscribing, so a cookie set before we attached is not missed.
+    Returns None on timeout.
+    """
+    import trio
+    from trio_websocket import open_websocket_url
+
+    with urlopen(f"http://{debugger_address}/json") as resp:
+        targets = json.load(resp)
+    # No default-less next() here: inside a coroutine a StopIteration is
+    # turned into RuntimeError (PEP 479) and would bypass the caller's fallback
+    ws_url = next(
+        (t["webSocketDebuggerUrl"] for t in targets if t.get("type") == "page"), None
+    )
+    if ws_url is None:
+        raise LookupError("no page target listed by DevTools")
+
+    async with open_websocket_url(ws_url, max_message_size=2**24) as ws:
+        await ws.send_message(json.dumps({"id": 1, "method": "Network.enable", "params": {}}))
+        with trio.move_on_after(timeout):
+            while True:
+                message = json.loads(await ws.get_message())
+                if message.get("id") == 1:
+                    existing = check_existing()
+                    if existing:
+                        return existing
+                elif message.get("method") == "Network.responseReceivedExtraInfo":
+                    headers = message["params"].get("headers", {})
+                    for name, value in headers.items():
+                        if name.lower() == "set-cookie":
+                            match = DSID_SET_COOKIE_RE.search(value)
+                            if match:
+                                return match.group(1)
+    return None
 
 
 def get_dsid_cookie(
@@ -97,6 +379,7 @@ def get_dsid_cookie(
     chrome_profile_dir: str,
     chromedriver_path: str | None = None,
     timeout: int = 300,
+    fetch_gwcert: bool = True,
 ) -> dict:
     """
     Launch browser, navigate to VPN URL, wait for DSID cookie after SAML auth.
@@ -106,12 +389,22 @@ def get_dsid_cookie(
         chrome_profile_dir: Directory for Chrome profile persistence
         chromedriver_path: Optional path to chromedriver binary
         timeout: Maximum seconds to wait for authentication
+        fetch_gwcert: Whether to fetch the gateway certificate fingerprint;
+            gwcert is empty when False
 
     Returns:
         Dict with gateway, cookie, gwcert keys
     """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
+
     hostname = urlparse(vpn_url).hostname
 
+    # Fetch the gateway certificate fingerprint in the background so the TLS
+    # handshake overlaps browser startup and the SSO wait
+    cert_future = start_gwcert_fetch(hostname) if fetch_gwcert else None
+
     # Clean up any stale lock files from previous crashed sessions
     cleanup_stale_chrome_locks(chrome_profile_dir)
 
@@ -129,29 +422,16 @@ def get_dsid_cookie(
     else:
         print("Warning: Could not find chromium in PATH, Selenium will try default locations", file=sys.stderr)
 
-    # Get original user agent from temp browser
-    temp_options = webdriver.ChromeOptions()
-    if chrome_binary:
-        temp_options.binary_location = chrome_binary
-    if service:
-        temp_driver = webdriver.Chrome(service=service, options=temp_options)
-    else:
-        temp_driver = webdriver.Chrome(options=temp_options)
-    original_ua = temp_driver.execute_script("return navigator.userAgent")
-    temp_driver.quit()
-    print(f"Original user agent: {original_ua}", file=sys.stderr)
-
-    # Transform to Windows user agent for Okta bypass
-    windows_ua = re.sub(r'X11; Linux x86_64', 'Windows NT 10.0; Win64; x64', original_ua)
-    print(f"Windows user agent: {windows_ua}", file=sys.stderr)
-
     # Setup Chrome options with bot detection evasion
-    chrome_options = uc.ChromeOptions()
+    chrome_options = webdriver.ChromeOptions()
     if chrome_binary:
         chrome_options.binary_location = chrome_binary
     chrome_options.add_argument("--window-size=800,900")
-    chrome_options.add_argument(f"user-agent={windows_ua}")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
     chrome_options.add_argument(f"user-data-dir={chrome_profile_dir}")
+    # The SSO flow never plays media or needs a warm shader cache
+    chrome_options.add_argument("--disable-features=AudioServiceOutOfProcess,MediaRouter")
+    chrome_options.add_argument("--disable-gpu-shader-disk-cache")
 
     if service:
         driver = webdriver.Chrome(service=service, options=chrome_options)
@@ -159,35 +439,59 @@ def get_dsid_cookie(
         # Fall back to letting selenium find/download it (not recommended in Nix)
         driver = webdriver.Chrome(options=chrome_options)
 
-    # Apply stealth.js to bypass Cloudflare/bot detection
-    stealth(
-        driver,
-        languages=["en-US", "en"],
-        vendor="Google Inc.",
-        platform="Win32",
-        webgl_vendor="Intel Inc.",
-        renderer="Intel Iris OpenGL Engine",
-        fix_hairline=True,
-    )
+    # Read the real user agent from the running browser over CDP instead of
+    # launching a throwaway browser just to evaluate navigator.userAgent
+    original_ua = driver.execute_cdp_cmd("Browser.getVersion", {})["userAgent"]
+    print(f"Original user agent: {original_ua}", file=sys.stderr)
+
+    # Transform to Windows user agent for Okta bypass
+    windows_ua = original_ua.replace("X11; Linux x86_64", "Windows NT 10.0; Win64; x64")
+    print(f"Windows user agent: {windows_ua}", file=sys.stderr)
+    driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": windows_ua, "platform": "Win32"})
+
+    # Apply stealth patches to bypass Cloudflare/bot detection
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": STEALTH_JS})
 
     try:
         # Initial page load with Windows user agent (bypasses Okta)
         driver.get(vpn_url)
 
-        # Switch back to Linux user agent after initial page load
+        # Switch back to Linux user agent for the rest of the SSO flow. The
+        # override applies to subsequent requests, so no re-navigation needed.
         driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": original_ua, "platform": "Linux"})
-        driver.get(vpn_url)
-        driver.back()
 
-        # Wait for DSID cookie (set after successful SAML/SSO auth)
-        dsid = WebDriverWait(driver, timeout).until(
-            lambda d: d.get_cookie("DSID")
-        )
+        def existing_dsid():
+            cookie = driver.get_cookie("DSID")
+            return cookie["value"] if cookie else None
+
+        # Wait for DSID cookie (set after successful SAML/SSO auth). Listen
+        # for the Set-Cookie on the CDP event stream rather than polling the
+        # cookie jar over WebDriver; polling is only the fallback.
+        import trio
+        from trio_websocket import ConnectionClosed, HandshakeError
+
+        # One budget for both: a listener that fails late must not restart
+        # the clock for the polling fallback
+        deadline = time.monotonic() + timeout
+        try:
+            dsid = trio.run(
+                _wait_for_dsid_event,
+                driver.capabilities["goog:chromeOptions"]["debuggerAddress"],
+                timeout,
+                existing_dsid,
+            )
+        except (LookupError, OSError, HandshakeError, ConnectionClosed) as e:
+            print(f"Warning: CDP event listener unavailable ({e}), polling for DSID", file=sys.stderr)
+            remaining = max(deadline - time.monotonic(), 0)
+            dsid = WebDriverWait(driver, remaining).until(lambda d: existing_dsid())
+
+        if not dsid:
+            raise Exception(f"Authentication timed out after {timeout} seconds")
 
         return {
             "gateway": hostname,
-            "cookie": dsid['value'],  # Just the value, openconnect -C expects raw cookie value
-            "gwcert": get_server_cert_fingerprint(hostname),
+            "cookie": dsid,  # Just the value, openconnect -C expects raw cookie value
+            "gwcert": gwcert_result(cert_future),
         }
     finally:
         driver.quit()
@@ -196,11 +500,17 @@ def get_dsid_cookie(
 def output_nm_format(result: dict) -> None:
     """Output in NetworkManager auth-dialog format (key\\nvalue\\n pairs)."""
     # NM expects these specific keys for openconnect
-    print(f"gateway\n{result['gateway']}")
-    print(f"cookie\n{result['cookie']}")
+    buf = f"gateway\n{result['gateway']}\ncookie\n{result['cookie']}\n"
     if result.get("gwcert"):
-        print(f"gwcert\n{result['gwcert']}")
-    print()  # Empty line signals end of secrets
+        buf += f"gwcert\n{result['gwcert']}\n"
+    buf += "\n"  # Empty line signals end of secrets
+
+    # Emit the whole blob with as few write syscalls as possible, bypassing
+    # the line-buffered text layer; loop since a pipe may take a short write
+    data = buf.encode()
+    sys.stdout.flush()
+    while data:
+        data = data[os.write(sys.stdout.fileno(), data):]
 
 
 def output_json_format(result: dict) -> None:
@@ -239,13 +549,20 @@ def main() -> int:
         default=None,
         help="Path to chromedriver binary",
     )
+    parser.add_argument(
+        "--no-gwcert",
+        action="store_true",
+        help="Skip fetching the gateway certificate fingerprint (e.g. when it is already pinned)",
+    )
     args = parser.parse_args()
 
     # Setup profile directory (same as openconnect-pulse-launcher for session sharing)
     profile_dir = args.profile_dir
     if profile_dir is None:
+        from xdg_base_dirs import xdg_config_home
+
         profile_dir = os.path.join(xdg_config_home(), "chromedriver", "pulsevpn")
-    os.makedirs(profile_dir, exist_ok=True)
+    _ensure_profile_dir(profile_dir)
 
     try:
         result = get_dsid_cookie(
@@ -253,6 +570,7 @@ def main() -> int:
             chrome_profile_dir=profile_dir,
             chromedriver_path=args.chromedriver_path,
             timeout=args.timeout,
+            fetch_gwcert=not args.no_gwcert,
         )
 
         if args.format == "json":
@@ -15,13 +15,16 @@ Output formats:
 """
 
 import argparse
+import asyncio
 import hashlib
 import json
 import os
 import socket
 import ssl
+import struct
 import sys
-import time
+import threading
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
 from urllib.parse import urlparse
 
 from cefpython3 import cefpython as cef
@@ -32,12 +35,22 @@ def get_xdg_config_home():
     return os.environ.get("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
 
 
+def _ensure_profile_dir(path: str) -> None:
+    """Create the browser profile directory unless it already exists."""
+    # A bare stat is the common case; makedirs only runs on first use
+    try:
+        os.stat(path)
+    except FileNotFoundError:
+        os.makedirs(path, exist_ok=True)
+
+
 class CookieVisitor:
     """
     CEF cookie visitor callback.
 
     CEF uses an async visitor pattern for cookie access.
-    This visitor is called for each cookie matching the URL.
+    This visitor is called for each cookie matching the URL, on CEF's IO
+    thread; the match is handed to the callback on the UI thread.
     """
 
     def __init__(self, target_cookie: str, callback):
@@ -49,27 +62,191 @@ class CookieVisitor:
         """Called for each cookie. Return True to continue, False to stop."""
         if cookie.GetName() == self.target_cookie:
             self.found_value = cookie.GetValue()
-            self.callback(self.found_value)
+            # Don't run the callback here: it finishes the auth flow
+            # (QuitMessageLoop), which must happen on the UI thread, and
+            # must not block the IO thread
+            cef.PostTask(cef.TID_UI, self.callback, self.found_value)
             return False  # Stop visiting
         return True  # Continue visiting
 
 
+# TLS 1.2 cipher suites offered by the probe ClientHello: ECDHE/RSA with
+# AES-GCM, ChaCha20 and AES-CBC, enough for any gateway that still speaks 1.2.
+_TLS12_CIPHER_SUITES = bytes.fromhex(
+    "c02fc02bc030c02ccca8cca9009c009dc013c014002f0035"
+)
+_TLS12_SIGNATURE_ALGORITHMS = bytes.fromhex("040305030603080408050806040105010601")
+
+
+# Shared context for the fallback handshake. The certificate is only hashed,
+# never verified, so no CA bundle is loaded and the context is cheap to keep.
+_CERT_CTX = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+_CERT_CTX.check_hostname = False
+_CERT_CTX.verify_mode = ssl.CERT_NONE
+
+
+def _tls_vector(data: bytes, length_bytes: int) -> bytes:
+    """Prefix data with its big-endian length, as TLS vectors are encoded."""
+    return len(data).to_bytes(length_bytes, "big") + data
+
+
+def _build_client_hello(hostname: str) -> bytes:
+    """Build a minimal TLS 1.2 ClientHello record with SNI for hostname."""
+    server_name = _tls_vector(b"\x00" + _tls_vector(hostname.encode("idna"), 2), 2)
+    extensions = b"".join(
+        ext_type + _tls_vector(ext_data, 2)
+        for ext_type, ext_data in (
+            (b"\x00\x00", server_name),
+            (b"\x00\x0a", _tls_vector(bytes.fromhex("001d00170018"), 2)),  # groups
+            (b"\x00\x0b", b"\x01\x00"),  # ec_point_formats: uncompressed
+            (b"\x00\x0d", _tls_vector(_TLS12_SIGNATURE_ALGORITHMS, 2)),
+            (b"\x00\x17", b""),  # extended_master_secret
+            (b"\xff\x01", b"\x00"),  # renegotiation_info
+        )
+    )
+    body = (
+        b"\x03\x03"  # client_version: TLS 1.2
+        + os.urandom(32)
+        + b"\x00"  # empty session_id
+        + _tls_vector(_TLS12_CIPHER_SUITES, 2)
+        + b"\x01\x00"  # compression: null only
+        + _tls_vector(extensions, 2)
+    )
+    handshake = b"\x01" + _tls_vector(body, 3)
+    return b"\x16\x03\x01" + _tls_vector(handshake, 2)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes from sock."""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed during TLS handshake")
+        buf += chunk
+    return bytes(buf)
+
+
+def _read_tls12_certificate(sock: socket.socket, hostname: str) -> "bytes | None":
+    """
+    Send a TLS 1.2 ClientHello and return the server's leaf certificate (DER).
+
+    In TLS 1.2 the Certificate handshake message is sent in the clear right
+    after ServerHello, so the handshake can be abandoned as soon as it arrives:
+    no key exchange, no Finished round trip. Returns None if the server answers
+    with an alert or anything unexpected (e.g. it only speaks TLS 1.3).
+    """
+    sock.sendall(_build_client_hello(hostname))
+
+    handshake = b""
+    while len(handshake) < 65536:
+        content_type, _, length = struct.unpack(">BHH", _recv_exact(sock, 5))
+        fragment = _recv_exact(sock, length)
+        if content_type != 0x16:  # not a handshake record (alert, etc.)
+            return None
+        handshake += fragment
+
+        # Walk the complete handshake messages received so far
+        offset = 0
+        while offset + 4 <= len(handshake):
+            msg_type = handshake[offset]
+            msg_len = int.from_bytes(handshake[offset + 1:offset + 4], "big")
+            if offset + 4 + msg_len > len(handshake):
+                break
+            if msg_type == 0x0b:  # Certificate
+                msg = handshake[offset + 4:offset + 4 + msg_len]
+                cert_len = int.from_bytes(msg[3:6], "big")
+                cert_der = msg[6:6 + cert_len]
+                return cert_der if len(cert_der) == cert_len and cert_len else None
+            if msg_type != 0x02:  # only ServerHello may precede it
+                return None
+            offset += 4 + msg_len
+    return None
+
+
+async def _race_connect(hostname: str, port: int) -> socket.socket:
+    """
+    Connect to hostname:port, racing all resolved addresses (RFC 8305).
+
+    Each address is tried 250 ms after the previous one without waiting for it
+    to fail, so a dead AAAA record no longer costs a full connect timeout.
+    The losing attempts are cancelled by asyncio.
+    """
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_connection(
+        asyncio.Protocol, hostname, port, happy_eyeballs_delay=0.25
+    )
+    try:
+        # Detach a plain socket from the transport for blocking use
+        return transport.get_extra_info("socket").dup()
+    finally:
+        transport.close()
+
+
+def _connect_gateway(hostname: str, port: int, timeout: float = 10) -> socket.socket:
+    """Open a blocking TCP connection to the gateway via _race_connect."""
+    sock = asyncio.run(asyncio.wait_for(_race_connect(hostname, port), timeout))
+    sock.settimeout(timeout)
+    return sock
+
+
 def get_server_cert_fingerprint(hostname: str, port: int = 443) -> str:
     """Get SHA256 fingerprint of server certificate for certificate pinning."""
-    context = ssl.create_default_context()
-    context.check_hostname = False
-    context.verify_mode = ssl.CERT_NONE
-
     try:
-        with socket.create_connection((hostname, port), timeout=10) as sock:
-            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                cert_der = ssock.getpeercert(binary_form=True)
-                return "sha256:" + hashlib.sha256(cert_der).hexdigest()
+        with _connect_gateway(hostname, port) as sock:
+            try:
+                cert_der = _read_tls12_certificate(sock, hostname)
+            except OSError:
+                cert_der = None  # e.g. reset on a TLS 1.2 ClientHello
+
+        if cert_der is None:
+            # No cleartext certificate (TLS 1.3-only gateway): fall back to a
+            # full handshake, whose certificate is only readable afterwards
+            with _connect_gateway(hostname, port) as sock:
+                with _CERT_CTX.wrap_socket(sock, server_hostname=hostname) as ssock:
+                    cert_der = ssock.getpeercert(binary_form=True)
+
+        return "sha256:" + hashlib.sha256(cert_der).digest().hex()
     except Exception as e:
         print(f"Warning: Could not get server certificate: {e}", file=sys.stderr)
         return ""
 
 
+# How long to wait for the background certificate probe once the cookie is
+# in hand. The probe started with the browser, so it normally finished long
+# ago; past this the cookie is delivered without a pinned certificate.
+GWCERT_WAIT_TIMEOUT = 15
+
+
+def start_gwcert_fetch(hostname: str) -> Future:
+    """
+    Fetch the gateway certificate fingerprint in the background.
+
+    Runs on a daemon thread so a stalled probe never holds up process exit.
+    """
+    future = Future()
+    threading.Thread(
+        target=lambda: future.set_result(get_server_cert_fingerprint(hostname)),
+        daemon=True,
+    ).start()
+    return future
+
+
+def gwcert_result(future: "Future | None") -> str:
+    """Result of start_gwcert_fetch, or "" if not fetched or still pending."""
+    if future is None:
+        return ""
+    try:
+        return future.result(timeout=GWCERT_WAIT_TIMEOUT)
+    except FuturesTimeoutError:
+        print(
+            f"Warning: Gateway certificate probe still running after "
+            f"{GWCERT_WAIT_TIMEOUT}s, continuing without it",
+            file=sys.stderr,
+        )
+        return ""
+
+
 def build_windows_user_agent() -> str:
     """
     Build Windows user agent string for Okta bypass.
@@ -83,19 +260,30 @@ def build_windows_user_agent() -> str:
     )
 
 
+# Reports the DSID cookie visible to the page back to AuthHandler.on_dsid.
+# Plain ES5: CEF 66 predates optional chaining.
+DSID_PROBE_JS = (
+    "var m = document.cookie.match(/(?:^|;\\s*)DSID=([^;]*)/);"
+    "on_dsid(m ? m[1] : '');"
+)
+
+
 class AuthHandler:
     """
-    Handles authentication flow by polling for DSID cookie.
+    Handles authentication flow by checking for the DSID cookie after each page load.
     """
 
-    def __init__(self, vpn_url: str, timeout: int):
+    def __init__(self, vpn_url: str, timeout: int, fetch_gwcert: bool = True):
         self.vpn_url = vpn_url
         self.hostname = urlparse(vpn_url).hostname
         self.timeout = timeout
         self.result = None
-        self.start_time = None
         self.browser = None
 
+        # Fetch the gateway certificate fingerprint in the background so the
+        # TLS handshake overlaps CEF startup and the SSO wait
+        self._cert_future = start_gwcert_fetch(self.hostname) if fetch_gwcert else None
+
     def on_cookie_found(self, dsid_value: str):
         """Called when DSID cookie is detected."""
         if not self.result:
@@ -103,8 +291,14 @@ class AuthHandler:
             self.result = {
                 "gateway": self.hostname,
                 "cookie": dsid_value,
-                "gwcert": get_server_cert_fingerprint(self.hostname),
+                "gwcert": gwcert_result(self._cert_future),
             }
+            cef.QuitMessageLoop()
+
+    def on_timeout(self):
+        """Called on the UI thread when the authentication timeout expires."""
+        if not self.result:
+            cef.QuitMessageLoop()
 
     def check_cookies(self):
         """Check for DSID cookie."""
@@ -118,32 +312,72 @@ class AuthHandler:
         except Exception as e:
             print(f"Cookie check error: {e}", file=sys.stderr)
 
-    def check_timeout(self):
-        """Check if authentication has timed out."""
-        if self.start_time and (time.time() - self.start_time) > self.timeout:
-            return True
-        return False
+    def on_dsid(self, value: str):
+        """
+        JavaScript binding called with the page's DSID from document.cookie.
+
+        An empty value means the page cannot see the cookie (HttpOnly, or a
+        page on the IdP's origin), so fall back to one cookie-jar visit.
+        """
+        if value:
+            self.on_cookie_found(value)
+        else:
+            self.check_cookies()
+
+    def OnLoadEnd(self, browser, frame, http_code):
+        """
+        CEF LoadHandler callback.
+
+        The DSID cookie is set by the response that ends the SAML flow, so
+        checking once per completed main-frame load replaces wall-clock polling.
+        The renderer reads document.cookie and reports back via on_dsid.
+        """
+        if frame.IsMain() and not self.result:
+            frame.ExecuteJavascript(DSID_PROBE_JS)
 
 
 def get_dsid_cookie(
     vpn_url: str,
     profile_dir: str,
     timeout: int = 300,
+    fetch_gwcert: bool = True,
 ) -> dict:
     """
     Launch CEF browser, navigate to VPN URL, wait for DSID cookie after SAML auth.
 
     Args:
         vpn_url: Full URL to VPN endpoint (e.g., https://vpn.example.com/emp)
-        profile_dir: Directory for browser profile persistence
+        profile_dir: Existing directory for browser profile persistence
         timeout: Maximum seconds to wait for authentication
+        fetch_gwcert: Whether to fetch the gateway certificate fingerprint;
+            gwcert is empty when False
 
     Returns:
         Dict with gateway, cookie, gwcert keys
     """
-    # Ensure profile directory exists
-    os.makedirs(profile_dir, exist_ok=True)
+    # Create auth handler first so its certificate fetch overlaps CEF startup
+    handler = AuthHandler(vpn_url, timeout, fetch_gwcert=fetch_gwcert)
+
+    initialize_cef(profile_dir)
+    open_auth_browser(handler)
+
+    # Block in CEF's own message loop; it is quit either by the cookie
+    # callback or by the timeout task, so nothing polls meanwhile.
+    cef.MessageLoop()
+
+    if not handler.result:
+        cef.Shutdown()
+        raise Exception(f"Authentication timed out after {timeout} seconds")
+
+    # Close browser and shutdown CEF
+    handler.browser.CloseBrowser(True)
+    cef.Shutdown()
+
+    return handler.result
 
+
+def initialize_cef(profile_dir: str) -> None:
+    """Initialize CEF with the persistent profile in profile_dir."""
     # Set up exception hook
     sys.excepthook = cef.ExceptHook
 
@@ -168,63 +402,48 @@ def get_dsid_cookie(
         # Disable features that slow things down
         "disable-gpu-compositing": "",  # Can actually help on some systems
         "disable-smooth-scrolling": "",
+        # The SSO flow never plays media; a warm shader cache isn't worth
+        # the first-run disk writes for a short-lived window
+        "disable-features": "AudioServiceOutOfProcess,MediaRouter",
+        "disable-gpu-shader-disk-cache": "",
     }
+    # Images stay enabled: IdP pages use them for captchas and QR codes
     # NOTE: WebAuthn/FIDO2 not supported in CEF 66 (Chromium 66, April 2018)
     # WebAuthn was finalized in 2019 and enabled by default in Chrome 67+
 
     # Initialize CEF
     cef.Initialize(settings, switches)
 
-    # Create auth handler
-    handler = AuthHandler(vpn_url, timeout)
-    handler.start_time = time.time()
 
-    # Create browser window
+def open_auth_browser(handler: AuthHandler) -> None:
+    """Open the auth window for handler and arm its timeout. Runs on the UI thread."""
     handler.browser = cef.CreateBrowserSync(
-        url=vpn_url,
+        url=handler.vpn_url,
         window_title="Pulse VPN Authentication",
     )
+    handler.browser.SetClientHandler(handler)
 
-    # Main event loop - process messages rapidly for responsive UI
-    last_cookie_check = 0
-    while True:
-        # Process CEF messages (do multiple iterations for responsiveness)
-        for _ in range(10):
-            cef.MessageLoopWork()
-
-        # Check cookies every second
-        now = time.time()
-        if now - last_cookie_check >= 1.0:
-            handler.check_cookies()
-            last_cookie_check = now
-
-        # Check if we got the result
-        if handler.result:
-            break
-
-        # Check timeout
-        if handler.check_timeout():
-            cef.Shutdown()
-            raise Exception(f"Authentication timed out after {timeout} seconds")
+    bindings = cef.JavascriptBindings(bindToFrames=False, bindToPopups=False)
+    bindings.SetFunction("on_dsid", handler.on_dsid)
+    handler.browser.SetJavascriptBindings(bindings)
 
-        # Minimal sleep - just yield to other processes
-        time.sleep(0.001)
-
-    # Close browser and shutdown CEF
-    handler.browser.CloseBrowser(True)
-    cef.Shutdown()
-
-    return handler.result
+    cef.PostDelayedTask(cef.TID_UI, handler.timeout * 1000, handler.on_timeout)
 
 
 def output_nm_format(result: dict) -> None:
     """Output in NetworkManager auth-dialog format (key\nvalue\n pairs)."""
     # NM expects these specific keys for openconnect
-    print(f"gateway\n{result['gateway']}")
-    print(f"cookie\n{result['cookie']}")
+    buf = f"gateway\n{result['gateway']}\ncookie\n{result['cookie']}\n"
     if result.get("gwcert"):
-        print(f"gwcert\n{result['gwcert']}")
-    print()  # Empty line signals end of secrets
+        buf += f"gwcert\n{result['gwcert']}\n"
+    buf += "\n"  # Empty line signals end of secrets
+
+    # Emit the whole blob with as few write syscalls as possible, bypassing
+    # the line-buffered text layer; loop since a pipe may take a short write
+    data = buf.encode()
+    sys.stdout.flush()
+    while data:
+        data = data[os.write(sys.stdout.fileno(), data):]
 
 
 def output_json_format(result: dict) -> None:
@@ -258,6 +477,11 @@ def main() -> int:
         default=None,
         help="Browser profile directory (default: ~/.config/cef/pulsevpn)",
     )
+    parser.add_argument(
+        "--no-gwcert",
+        action="store_true",
+        help="Skip fetching the gateway certificate fingerprint (e.g. when it is already pinned)",
+    )
     args = parser.parse_args()
 
     # Setup profile directory
@@ -266,10 +490,12 @@ def main() -> int:
         profile_dir = os.path.join(get_xdg_config_home(), "cef", "pulsevpn")
 
     try:
+        _ensure_profile_dir(profile_dir)
         result = get_dsid_cookie(
             vpn_url=args.url,
             profile_dir=profile_dir,
             timeout=args.timeout,
+            fetch_gwcert=not args.no_gwcert,
         )
 
         if args.format == "json":
@@ -9,58 +9,16 @@
   vpnc-scripts,
   gobject-introspection,
   wrapGAppsHook3,
-  fetchurl,
-  fetchPypi,
   util-linux,  # For runuser (direct auth-dialog launch)
   systemd,     # For loginctl (session detection)
 }:
 
 let
-  # Build selenium-stealth from PyPI (not in nixpkgs)
-  selenium-stealth = python3.pkgs.buildPythonPackage rec {
-    pname = "selenium-stealth";
-    version = "1.0.6";
-    format = "wheel";
-
-    src = fetchurl {
-      url = "https://files.pythonhosted.org/packages/cb/ac/7877df8b819d54a4e317a093a0a9e0a38d21d884a7250aa713f2f0869442/selenium_stealth-1.0.6-py3-none-any.whl";
-      hash = "sha256-ti2lRSqkqE8ppN+yGpaWr/IHiKfFcN0LgbwEqUCEi5c=";
-    };
-
-    propagatedBuildInputs = with python3.pkgs; [
-      selenium
-      setuptools
-    ];
-
-    doCheck = false;
-  };
-
-  # Build undetected-chromedriver from PyPI (same as openconnect-pulse-launcher)
-  undetected-chromedriver = python3.pkgs.buildPythonPackage rec {
-    pname = "undetected-chromedriver";
-    version = "3.5.5";
-    format = "setuptools";
-
-    src = fetchPypi {
-      inherit pname version;
-      hash = "sha256-n5ReFDUAUker4X3jFrz9qFsoSkF3/V8lFnx4ztM7Zew=";
-    };
-
-    propagatedBuildInputs = with python3.pkgs; [
-      selenium
-      requests
-      websockets
-      setuptools
-    ];
-
-    doCheck = false;
-  };
-
   # Python environment for auth-dialog (needs selenium for browser auth)
   pythonEnvAuth = python3.withPackages (ps: with ps; [
     selenium
-    selenium-stealth
-    undetected-chromedriver
+    trio
+    trio-websocket  # CDP event listener for the DSID Set-Cookie
     xdg-base-dirs
     setuptools  # Required for distutils compatibility in Python 3.12+
   ]);
@@ -152,7 +110,7 @@ stdenv.mkDerivation rec {
       This plugin provides NetworkManager integration for Pulse Secure VPNs
       that require browser-based SAML/SSO authentication.
 
-      Uses Selenium WebDriver with undetected-chromedriver for browser automation.
+      Uses Selenium WebDriver with CDP-injected stealth patches for browser automation.
 
       Architecture:
       - auth-dialog: Runs as user, opens browser for SAML auth, outputs credentials
@@ -434,7 +434,7 @@ in
       default = false;
       description = ''
         Use Selenium WebDriver for VPN authentication browser.
-        When enabled, uses Selenium with undetected-chromedriver.
+        When enabled, uses Selenium with CDP-injected stealth patches.
         When disabled (default), uses CEF (Chromium Embedded Framework).
 
         CEF advantages (default):
@@ -577,7 +577,7 @@ in
       wantedBy = [ "multi-user.target" ];
       after = [ "network.target" "NetworkManager.service" ];
       before = cfg.restartBeforeServices;
-      restartTriggers = [ nm-pulse-sso cfg.enableDtls cfg.enableTcpKeepalive cfg.tcpKeepaliveInterval ];
+      restartTriggers = [ nm-pulse-sso cfg.enableDtls cfg.enableTcpKeepalive cfg.tcpKeepaliveInterval cfg.mtu ];
 
       serviceConfig = {
         Type = "oneshot";
@@ -18,6 +18,8 @@ which NetworkManager runs as the user BEFORE calling Connect().
 import logging
 import os
 import pwd
+import random
+import re
 import signal
 import socket
 import struct
@@ -27,10 +29,11 @@ import threading
 import time
 
 from argparse import ArgumentParser, Namespace
+from collections import deque
 from enum import IntEnum
 from functools import wraps
 from pathlib import Path
-from subprocess import PIPE, Popen
+from types import MappingProxyType
 from typing import Any, Optional
 from urllib.parse import urlparse
 
@@ -38,15 +41,25 @@ import dbus
 import dbus.mainloop.glib
 import dbus.service
 from dbus.service import method, signal as dbus_signal
-from gi.repository import GLib
+from gi.repository import Gio, GLib
 
 NM_DBUS_SERVICE = "org.freedesktop.NetworkManager.pulse-sso"
 NM_DBUS_INTERFACE = "org.freedesktop.NetworkManager.VPN.Plugin"
 NM_DBUS_PATH = "/org/freedesktop/NetworkManager/VPN/Plugin"
 
+# NetworkManager's own D-Bus names, for settings lookups and re-activation
+NM_BUS_NAME = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+NM_INTERFACE = "org.freedesktop.NetworkManager"
+NM_SETTINGS_PATH = "/org/freedesktop/NetworkManager/Settings"
+NM_SETTINGS_INTERFACE = "org.freedesktop.NetworkManager.Settings"
+NM_SETTINGS_CONNECTION_INTERFACE = "org.freedesktop.NetworkManager.Settings.Connection"
+
 # Config file written by NixOS
 CONFIG_PATH = Path("/etc/nm-pulse-sso/config")
 
+_ENABLE_DTLS_RE = re.compile(rb"^[ \t]*ENABLE_DTLS=(.*)$", re.MULTILINE)
+
 
 def is_dtls_enabled() -> bool:
     """
@@ -54,15 +67,16 @@ def is_dtls_enabled() -> bool:
 
     Returns True if DTLS is enabled (better performance, UDP/ESP tunnel).
     Returns False if DTLS is disabled (uses --no-dtls, TCP/SSL only).
+
+    PulseSSOPlugin keeps the result in _dtls_enabled and calls this again
+    only from _reload_config (file change or SIGHUP).
     """
     try:
         if CONFIG_PATH.exists():
-            content = CONFIG_PATH.read_text()
-            for line in content.splitlines():
-                line = line.strip()
-                if line.startswith("ENABLE_DTLS="):
-                    value = line.split("=", 1)[1].strip().lower()
-                    return value == "true"
+            # Match on the raw bytes; nothing else in the file needs decoding
+            match = _ENABLE_DTLS_RE.search(CONFIG_PATH.read_bytes())
+            if match:
+                return match.group(1).strip().lower() == b"true"
     except Exception as e:
         logger.warning("Failed to read config file %s: %s", CONFIG_PATH, e)
     # Default to DTLS disabled (current behavior)
@@ -78,13 +92,13 @@ def get_vpn_mtu() -> "int | None":
     """
     try:
         if CONFIG_PATH.exists():
-            content = CONFIG_PATH.read_text()
-            for line in content.splitlines():
-                line = line.strip()
-                if line.startswith("VPN_MTU="):
-                    val = line.split("=", 1)[1].strip()
-                    if val:
-                        return int(val)
+            with CONFIG_PATH.open() as f:
+                for line in f:
+                    line = line.lstrip()
+                    if line.startswith("VPN_MTU="):
+                        val = line.split("=", 1)[1].strip()
+                        if val:
+                            return int(val)
     except Exception as e:
         logger.warning("Failed to read VPN MTU config: %s", e)
     return None
@@ -100,16 +114,24 @@ def get_tcp_keepalive_config() -> tuple:
     interval = None
     try:
         if CONFIG_PATH.exists():
-            content = CONFIG_PATH.read_text()
-            for line in content.splitlines():
-                line = line.strip()
-                if line.startswith("ENABLE_TCP_KEEPALIVE="):
-                    value = line.split("=", 1)[1].strip().lower()
-                    enabled = value == "true"
-                elif line.startswith("TCP_KEEPALIVE_INTERVAL="):
-                    val = line.split("=", 1)[1].strip()
-                    if val:
-                        interval = int(val)
+            seen = set()
+            with CONFIG_PATH.open() as f:
+                for line in f:
+                    line = line.lstrip()
+                    key, sep, value = line.partition("=")
+                    if not sep or key in seen:
+                        continue
+                    if key == "ENABLE_TCP_KEEPALIVE":
+                        enabled = value.strip().lower() == "true"
+                    elif key == "TCP_KEEPALIVE_INTERVAL":
+                        value = value.strip()
+                        if value:
+                            interval = int(value)
+                    else:
+                        continue
+                    seen.add(key)
+                    if len(seen) == 2:
+                        break
     except Exception as e:
         logger.warning("Failed to read TCP keepalive config: %s", e)
     return enabled, interval
@@ -124,33 +146,90 @@ logger = logging.getLogger("nm-pulse-sso")
 
 def trace(fn):
     """Decorator to log method calls for debugging."""
+    # Checked per call, not at decoration time: --debug raises the level in
+    # main(), after this module (and its decorators) has already loaded.
+    name = fn.__name__
 
     @wraps(fn)
     def traced(self, *args, **kwargs):
-        logger.debug("%s(%s, %s)", fn.__name__, args, kwargs)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s(%s, %s)", name, args, kwargs)
         return fn(self, *args, **kwargs)
 
     return traced
 
 
+def _convert_dbus_dict(obj) -> dict:
+    return {str(k): convert_dbus_types(v) for k, v in obj.items()}
+
+
+def _convert_dbus_array(obj) -> list:
+    return [convert_dbus_types(el) for el in obj]
+
+
+# Exact dbus-python type -> converter. dbus-python unmarshals into these
+# classes directly, so one dict lookup replaces an isinstance cascade per node.
+_DBUS_CONVERTERS = {
+    dbus.Dictionary: _convert_dbus_dict,
+    dbus.Array: _convert_dbus_array,
+    dbus.String: str,
+    dbus.UInt16: int,
+    dbus.UInt32: int,
+    dbus.UInt64: int,
+    dbus.Int16: int,
+    dbus.Int32: int,
+    dbus.Int64: int,
+    dbus.Boolean: bool,
+    dbus.Byte: int,
+}
+
+
 def convert_dbus_types(obj):
     """Convert D-Bus types to native Python types."""
-    if isinstance(obj, dbus.Dictionary):
-        return {str(k): convert_dbus_types(v) for k, v in obj.items()}
-    elif isinstance(obj, dbus.Array):
-        return [convert_dbus_types(el) for el in obj]
-    elif isinstance(obj, dbus.String):
-        return str(obj)
-    elif isinstance(obj, (dbus.UInt16, dbus.UInt32, dbus.UInt64)):
-        return int(obj)
-    elif isinstance(obj, (dbus.Int16, dbus.Int32, dbus.Int64)):
-        return int(obj)
-    elif isinstance(obj, dbus.Boolean):
-        return bool(obj)
-    elif isinstance(obj, dbus.Byte):
-        return int(obj)
-    else:
+    converter = _DBUS_CONVERTERS.get(type(obj))
+    if converter is None:
         return obj
+    return converter(obj)
+
+
+# Shared read-only stand-in for an absent connection setting or section
+_NO_SETTINGS = MappingProxyType({})
+
+
+def extract_vpn_fields(connection: dict) -> tuple[str, str, str, str]:
+    """
+    Pull (gateway, cookie, gwcert, resolve) out of an NM connection dict.
+
+    Works on the raw D-Bus dict as well as a converted one, so callers that
+    only need these fields can skip convert_dbus_types on the whole tree.
+    Missing sections or keys come back as ''.
+    """
+    vpn = connection.get("vpn", _NO_SETTINGS)
+    data = vpn.get("data", _NO_SETTINGS)
+    secrets = vpn.get("secrets", _NO_SETTINGS)
+    return (
+        str(data.get("gateway", "")),
+        str(secrets.get("cookie", "")),
+        str(secrets.get("gwcert", "")),
+        str(secrets.get("resolve", "")),
+    )
+
+
+_URL_SCHEMES = ("http://", "https://")
+
+
+def ensure_https(gateway: str) -> str:
+    """Prefix a bare gateway host with https://; full URLs pass through."""
+    return gateway if gateway.startswith(_URL_SCHEMES) else f"https://{gateway}"
+
+
+def redact_secrets(connection: dict) -> dict:
+    """Shallow copy of an NM connection dict with vpn.secrets values masked."""
+    vpn = connection.get("vpn", _NO_SETTINGS)
+    secrets = vpn.get("secrets")
+    if not secrets:
+        return connection
+    return {**connection, "vpn": {**vpn, "secrets": dict.fromkeys(secrets, "***")}}
 
 
 class ServiceState(IntEnum):
@@ -165,6 +244,21 @@ class ServiceState(IntEnum):
     Stopped = 6
 
 
+class PluginPhase(IntEnum):
+    """
+    What the plugin is doing between NM calls.
+
+    Reauthenticating: a browser re-auth is pending or running, so a
+    Disconnect() from NM must not tear the service down.
+    Disconnecting: a disconnect was requested, so openconnect exits are
+    expected and nothing may be restarted.
+    """
+
+    Idle = 0
+    Reauthenticating = 1
+    Disconnecting = 2
+
+
 class InteractiveNotSupportedError(dbus.DBusException):
     """Exception for unsupported interactive authentication."""
 
@@ -211,7 +305,7 @@ class PulseSSOPlugin(dbus.service.Object):
         self.loop = loop
         self.helper_script = helper_script
 
-        self.proc: Optional[Popen] = None
+        self.proc_pid: Optional[int] = None
         self.config = {}
         self.ip4config = {}
 
@@ -229,12 +323,27 @@ class PulseSSOPlugin(dbus.service.Object):
         # Pending connection for interactive flow
         self.pending_connection: Optional[dict] = None
 
-        # Track whether disconnect was requested (vs unexpected exit)
-        self._disconnect_requested: bool = False
+        # Disconnect-requested / re-auth-pending state, see PluginPhase.
+        # Changed only through _set_phase and _leave_phase.
+        self._phase: PluginPhase = PluginPhase.Idle
+
+        # Bumped by every Connect/ConnectInteractive. _shutdown records the
+        # value it started under in _shutdown_generation and abandons the
+        # quit if a new connection arrives while it is still in flight.
+        self._connect_generation: int = 0
+        self._shutdown_generation: Optional[int] = None
 
         # Child watch source ID for cleanup
         self._child_watch_id: Optional[int] = None
 
+        # SIGKILL fallback timer while _stop_openconnect waits for SIGTERM
+        self._openconnect_kill_timeout_id: Optional[int] = None
+
+        # Set while _restart_via_nm waits for openconnect to exit. Like a
+        # pending re-activation timer, it marks a Disconnect in that window
+        # as user-initiated; _do_connect clears it to supersede the restart.
+        self._restart_stop_pending: bool = False
+
         # Pending NM re-activation timer (to cancel if user disconnects during delay)
         self._reactivation_timeout_id: Optional[int] = None
 
@@ -257,6 +366,15 @@ class PulseSSOPlugin(dbus.service.Object):
         # re-activate the correct connection when duplicates exist.
         self._active_conn_uuid: str = ""
 
+        # NM settings object path of our VPN connection, remembered once a
+        # lookup has resolved it so _clear_cached_secrets can skip the
+        # ListConnections/GetSettings scan.
+        self._nm_conn_path: Optional[str] = None
+
+        # Set once NM has handed us a cookie (so it holds cached secrets for
+        # the connection); _clear_cached_secrets is a no-op until then.
+        self._nm_has_secrets: bool = False
+
         # Count consecutive auth failures to prevent infinite loops
         self._auth_failure_count: int = 0
 
@@ -271,14 +389,16 @@ class PulseSSOPlugin(dbus.service.Object):
         # ungraceful tunnel termination (e.g., nixos-rebuild, network loss).
         self._needs_post_disruption_delay: bool = False
 
-        # Flag to prevent Disconnect() from quitting when we're about to trigger
-        # browser re-auth (prevents race with NM calling Disconnect after StateChanged)
-        self._reconnection_pending: bool = False
-
         # Count consecutive non-auth restart failures to detect stale cookies
         # (openconnect returns code 1 instead of 2 when cookie is IP-bound/stale)
         self._consecutive_restart_failures: int = 0
 
+        # Unexpected openconnect exits since the tunnel last came up, used
+        # for the re-activation backoff. Unlike the counter above it
+        # survives the Connect that each re-activation goes through, and is
+        # only reset by SetIp4Config or a user disconnect.
+        self._reactivation_failures: int = 0
+
         # Retry tracking for auth dialog attempts (nm-applet may not be ready after suspend)
         self._reconnection_retry_count: int = 0
         self._max_reconnection_retries: int = 10
@@ -294,10 +414,17 @@ class PulseSSOPlugin(dbus.service.Object):
         self._direct_auth_timeout_id: Optional[int] = None
 
         # Track the running auth-dialog subprocess for cancellation
-        self._auth_dialog_proc: Optional[Popen] = None
+        self._auth_dialog_pid: Optional[int] = None
         self._auth_dialog_child_watch_id: Optional[int] = None
         self._auth_dialog_timeout_id: Optional[int] = None
 
+        # Auth-dialog stdout/stderr, collected by GLib IO watches while it
+        # runs. _auth_dialog_pipes maps each open pipe fd to its watch ID
+        # and the buffer it fills.
+        self._auth_dialog_stdout = bytearray()
+        self._auth_dialog_stderr = bytearray()
+        self._auth_dialog_pipes: dict[int, tuple[int, bytearray]] = {}
+
         # Transient unit name and target user for the active auth-dialog
         # systemd-run invocation. Set when launching, used to explicitly stop
         # the unit on disconnect — systemd's stop tears down the cgroup
@@ -352,6 +479,12 @@ class PulseSSOPlugin(dbus.service.Object):
         # that quirk from a genuine user-initiated disconnect.
         self._last_starting_ts: float = 0.0
 
+        # Last state sent via StateChanged. _emit_state skips repeats so
+        # retry storms don't flood NM (and its applets) with duplicate
+        # signals; reset by Connect()/ConnectInteractive() so each new
+        # activation always sees its states.
+        self._last_emitted_state: Optional[ServiceState] = None
+
         # True once openconnect has reported a live tunnel (SetIp4Config ->
         # StateChanged(Started)) for the current process. While False, a
         # Disconnect() landing inside the post-Starting quirk window is NM's
@@ -379,23 +512,169 @@ class PulseSSOPlugin(dbus.service.Object):
         # transient errors (not real auth failures).
         self._all_strategies_transient: bool = True
 
+        # logind Manager proxy, shared by the PrepareForSleep subscription
+        # and the graphical-session lookup done on every direct-auth attempt.
+        # introspect=False skips the Introspect round-trip; the method names
+        # are known. Created below with the subscription; None when logind
+        # is unavailable, in which case it is retried per lookup.
+        self._logind_manager: Optional[dbus.Interface] = None
+
+        # NM Settings proxy for connection lookups on re-activation and
+        # disconnect. It follows the well-known name so it keeps working
+        # across NetworkManager restarts.
+        self._nm_settings = dbus.Interface(
+            conn.get_object(
+                NM_BUS_NAME,
+                NM_SETTINGS_PATH,
+                introspect=False,
+                follow_name_owner_changes=True,
+            ),
+            NM_SETTINGS_INTERFACE,
+        )
+
         # Subscribe to systemd-logind PrepareForSleep signal to prevent
         # spurious mid-sleep auth-dialog popups (e.g. when post-resume.target
         # and a new suspend overlap during a brief s2idle wake cycle).
         try:
-            login1_proxy = conn.get_object(
-                "org.freedesktop.login1", "/org/freedesktop/login1"
-            )
-            login1_iface = dbus.Interface(
-                login1_proxy, "org.freedesktop.login1.Manager"
-            )
-            login1_iface.connect_to_signal(
+            self._logind_manager = self._get_logind_manager()
+            self._logind_manager.connect_to_signal(
                 "PrepareForSleep", self._on_prepare_for_sleep
             )
             logger.debug("Subscribed to PrepareForSleep signal from systemd-logind")
         except Exception as e:
             logger.warning("Failed to subscribe to PrepareForSleep signal: %s", e)
 
+        # Keep self._nm_conn_path coherent: forget it when its connection is
+        # deleted or NetworkManager restarts (object paths are not stable
+        # across NM instances).
+        try:
+            conn.add_signal_receiver(
+                self._on_nm_connection_removed,
+                signal_name="ConnectionRemoved",
+                dbus_interface=NM_SETTINGS_INTERFACE,
+                bus_name=NM_BUS_NAME,
+                path=NM_SETTINGS_PATH,
+            )
+            conn.add_signal_receiver(
+                self._on_nm_owner_changed,
+                signal_name="NameOwnerChanged",
+                dbus_interface="org.freedesktop.DBus",
+                arg0=NM_BUS_NAME,
+            )
+        except Exception as e:
+            logger.warning("Failed to subscribe to NetworkManager signals: %s", e)
+
+        # passwd entries of graphical-session users, so auth retries don't
+        # go back to NSS (possibly sssd/LDAP) every attempt. Cleared by
+        # _reload_config.
+        self._pwd_cache: dict[str, pwd.struct_passwd] = {}
+
+        # DTLS setting from the NixOS config file and the openconnect
+        # arguments that derive from it, refreshed by _reload_config when
+        # the file changes or on SIGHUP.
+        self._dtls_enabled: bool = is_dtls_enabled()
+        self._openconnect_prefix: tuple[str, ...] = self._build_openconnect_prefix()
+
+        # Watch the config file so edits apply without a restart. On NixOS
+        # the path is a symlink into /etc/static, and a rebuild swaps that
+        # symlink rather than touching this one; the module's
+        # restartTriggers restart the service on those rebuilds instead.
+        self._config_monitor = None
+        try:
+            self._config_monitor = Gio.File.new_for_path(str(CONFIG_PATH)).monitor_file(
+                Gio.FileMonitorFlags.NONE, None
+            )
+            self._config_monitor.connect("changed", self._on_config_changed)
+        except GLib.Error as e:
+            logger.warning("Failed to monitor %s: %s", CONFIG_PATH, e)
+
+    def _on_config_changed(self, monitor, file, other_file, event_type):
+        """Gio.FileMonitor callback: reload once per completed change."""
+        if event_type in (
+            Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+            Gio.FileMonitorEvent.CREATED,
+            Gio.FileMonitorEvent.DELETED,
+        ):
+            self._reload_config()
+
+    def _reload_config(self):
+        """
+        Re-read the config file and refresh the cached settings.
+
+        The only refresh path: the file monitor and SIGHUP both land here,
+        and nothing on the connect path reads the file.
+        """
+        self._pwd_cache.clear()
+        self._dtls_enabled = is_dtls_enabled()
+        self._openconnect_prefix = self._build_openconnect_prefix()
+        logger.info(
+            "Reloaded %s (DTLS/ESP %s)",
+            CONFIG_PATH, "enabled" if self._dtls_enabled else "disabled",
+        )
+
+    def _build_openconnect_prefix(self) -> tuple[str, ...]:
+        """
+        Build the openconnect arguments that depend only on configuration.
+
+        _start_openconnect appends --resolve, the cookie and the gateway.
+        """
+        # Build openconnect command based on working openconnect-pulse-launcher
+        # Key differences from CLI version:
+        # - No -b (background): we need to track the process for disconnect
+        # - Using --script with helper that CALLS vpnc-script AND reports to D-Bus
+        #
+        # DTLS/ESP handling:
+        # - With DTLS disabled: --no-dtls forces SSL-only mode (TCP only).
+        # - With DTLS enabled: uses ESP/UDP for better performance.
+        # Reconnection is handled externally by vpn-auto-reconnect service via nmcli.
+        logger.info("DTLS/ESP mode: %s", "enabled" if self._dtls_enabled else "disabled")
+
+        cmd = [
+            "openconnect",
+            "--protocol=pulse",
+            f"--script={self.helper_script}",
+        ]
+
+        # Only add --no-dtls if DTLS is disabled
+        if not self._dtls_enabled:
+            cmd.append("--no-dtls")
+
+        # TCP keepalive handling
+        keepalive_enabled, keepalive_interval = get_tcp_keepalive_config()
+        if keepalive_enabled:
+            if keepalive_interval is not None:
+                cmd.append(f"--keepalive={keepalive_interval}")
+            else:
+                cmd.append("--keepalive")
+            logger.info(
+                "TCP keepalive: enabled (interval=%s)",
+                keepalive_interval if keepalive_interval else "system default",
+            )
+
+        vpn_mtu = get_vpn_mtu()
+        if vpn_mtu is not None:
+            cmd.append(f"--mtu={vpn_mtu}")
+            logger.info("VPN MTU override: %d", vpn_mtu)
+
+        return tuple(cmd)
+
+    def _getpwnam(self, user: str) -> pwd.struct_passwd:
+        """pwd.getpwnam with a per-user cache; a miss is never cached."""
+        pw = self._pwd_cache.get(user)
+        if pw is None:
+            pw = self._pwd_cache[user] = pwd.getpwnam(user)
+        return pw
+
+    def _on_nm_connection_removed(self, conn_path):
+        """Drop the cached NM connection path when that connection is deleted."""
+        if self._nm_conn_path == str(conn_path):
+            logger.debug("VPN connection %s removed from NM", conn_path)
+            self._nm_conn_path = None
+
+    def _on_nm_owner_changed(self, name, old_owner, new_owner):
+        """Drop the cached NM connection path when NetworkManager restarts."""
+        self._nm_conn_path = None
+
     def _on_prepare_for_sleep(self, active: bool):
         """
         Handle systemd-logind PrepareForSleep signal.
@@ -460,17 +739,10 @@ class PulseSSOPlugin(dbus.service.Object):
         once we have all required credentials.
         """
         try:
-            # Extract VPN data (from connection config)
-            vpn_data = connection.get("vpn", {}).get("data", {})
-            gateway = vpn_data.get("gateway", "")
-
-            # Extract secrets
-            vpn_secrets = connection.get("vpn", {}).get("secrets", {})
-            cookie = vpn_secrets.get("cookie", "")
-            servercert = vpn_secrets.get("gwcert", "")
-            # Optional "HOST:IP" override for the browser-auth backend; see
-            # __init__ for why we need it.
-            resolve = vpn_secrets.get("resolve", "")
+            # Extract VPN data and secrets. resolve is the optional "HOST:IP"
+            # override for the browser-auth backend; see __init__ for why we
+            # need it.
+            gateway, cookie, servercert, resolve = extract_vpn_fields(connection)
 
             if not gateway:
                 raise LaunchFailedError("No gateway specified in VPN configuration")
@@ -481,8 +753,7 @@ class PulseSSOPlugin(dbus.service.Object):
                 )
 
             # Ensure gateway has https:// prefix (openconnect needs full URL)
-            if not gateway.startswith("http://") and not gateway.startswith("https://"):
-                gateway = f"https://{gateway}"
+            gateway = ensure_https(gateway)
 
             logger.info("Starting openconnect for gateway: %s", gateway)
             self._emit_starting()
@@ -492,11 +763,8 @@ class PulseSSOPlugin(dbus.service.Object):
             self.servercert = servercert
             self.resolve = resolve or None
 
-            # Reset disconnect flag - we're starting a new connection
-            self._disconnect_requested = False
-
-            # Clear reconnection state - we're now actually connecting
-            self._reconnection_pending = False
+            # New connection: no disconnect pending, and any re-auth is done
+            self._set_phase(PluginPhase.Idle)
             self._reconnection_retry_count = 0
             self._consecutive_restart_failures = 0
 
@@ -505,9 +773,10 @@ class PulseSSOPlugin(dbus.service.Object):
             # re-activation is still scheduled, the old timer is stale.
             # Leaving it set causes Disconnect() to misidentify NM's
             # reactive cleanup as a user disconnect and quit the service.
-            if self._reactivation_timeout_id is not None:
-                GLib.source_remove(self._reactivation_timeout_id)
-                self._reactivation_timeout_id = None
+            # A restart still waiting for the old openconnect to exit is
+            # superseded the same way.
+            self._cancel_timer("_reactivation_timeout_id")
+            self._restart_stop_pending = False
 
             self._start_openconnect()
 
@@ -515,7 +784,7 @@ class PulseSSOPlugin(dbus.service.Object):
             raise
         except Exception as e:
             logger.exception("_do_connect failed")
-            self.StateChanged(ServiceState.Stopped)
+            self._emit_state(ServiceState.Stopped)
             raise LaunchFailedError(f"Connection failed: {e}")
 
     def _cleanup_stale_vpn_routes(self):
@@ -619,42 +888,9 @@ class PulseSSOPlugin(dbus.service.Object):
             logger.debug("DNS cache flush failed (non-fatal): %s", e)
 
         self._cleanup_stale_vpn_routes()
-        # Build openconnect command based on working openconnect-pulse-launcher
-        # Key differences from CLI version:
-        # - No -b (background): we need to track the process for disconnect
-        # - Using --script with helper that CALLS vpnc-script AND reports to D-Bus
-        #
-        # DTLS/ESP handling:
-        # - With DTLS disabled: --no-dtls forces SSL-only mode (TCP only).
-        # - With DTLS enabled: uses ESP/UDP for better performance.
-        # Reconnection is handled externally by vpn-auto-reconnect service via nmcli.
-        dtls_enabled = is_dtls_enabled()
-        logger.info("DTLS/ESP mode: %s", "enabled" if dtls_enabled else "disabled")
-
-        cmd = [
-            "openconnect",
-        ]
-
-        # Only add --no-dtls if DTLS is disabled
-        if not dtls_enabled:
-            cmd.append("--no-dtls")
-
-        # TCP keepalive handling
-        keepalive_enabled, keepalive_interval = get_tcp_keepalive_config()
-        if keepalive_enabled:
-            if keepalive_interval is not None:
-                cmd.append(f"--keepalive={keepalive_interval}")
-            else:
-                cmd.append("--keepalive")
-            logger.info(
-                "TCP keepalive: enabled (interval=%s)",
-                keepalive_interval if keepalive_interval else "system default",
-            )
-
-        vpn_mtu = get_vpn_mtu()
-        if vpn_mtu is not None:
-            cmd.append(f"--mtu={vpn_mtu}")
-            logger.info("VPN MTU override: %d", vpn_mtu)
+        # Config-derived flags come from the prefix built at startup / reload;
+        # only the per-connection arguments are added here.
+        cmd = list(self._openconnect_prefix)
 
         # If the browser-auth backend supplied a HOST:IP override, tell
         # openconnect about it: --resolve bypasses /etc/hosts (which still
@@ -674,41 +910,25 @@ class PulseSSOPlugin(dbus.service.Object):
             cmd.append(f"--resolve={self.resolve}")
             logger.info("openconnect --resolve=%s", self.resolve)
 
-        cmd.extend(
-            [
-                "-C",
-                self.cookie,
-                "--protocol=pulse",
-                f"--script={self.helper_script}",
-                self.gateway,
-            ]
-        )
-
         # Log command (but mask cookie value)
-        safe_cmd = [
-            c if i == 0 or cmd[i - 1] != "-C" else "***" for i, c in enumerate(cmd)
-        ]
-        logger.info("Executing: %s", " ".join(safe_cmd))
-
-        # Set environment for helper script to find our D-Bus service
-        env = os.environ.copy()
-        env["NM_DBUS_SERVICE_PULSE_SSO"] = NM_DBUS_SERVICE
+        logger.info("Executing: %s", " ".join([*cmd, "-C", "***", self.gateway]))
+        cmd.extend(["-C", self.cookie, self.gateway])
 
         # Redirect stdin to avoid blocking. Capture stderr into a pipe so we
         # can drain it on a thread and forward each line through the Python
         # logger — that gives us per-line timestamps AND lets us re-emit the
         # final few lines on unexpected-exit, instead of relying on whatever
-        # systemd-journald happened to buffer.
-        import subprocess
-        import threading
-        from collections import deque
-
-        self.proc = Popen(
+        # systemd-journald happened to buffer. GLib owns the child: it is
+        # not reaped automatically, the child watch below reaps it.
+        self.proc_pid, _, _, stderr_fd = GLib.spawn_async(
             cmd,
-            env=env,
-            stdin=subprocess.DEVNULL,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
+            flags=(
+                GLib.SpawnFlags.SEARCH_PATH
+                | GLib.SpawnFlags.DO_NOT_REAP_CHILD
+                | GLib.SpawnFlags.STDIN_FROM_DEV_NULL
+                | GLib.SpawnFlags.STDOUT_TO_DEV_NULL
+            ),
+            standard_error=True,
         )
         # New process — tunnel not yet up. Arms the post-Starting Disconnect
         # quirk window in Disconnect(); cleared in SetIp4Config on success.
@@ -753,8 +973,7 @@ class PulseSSOPlugin(dbus.service.Object):
                         if (self._transport_err_count >= 50
                                 and now - self._transport_err_first >= 15.0):
                             self._transport_restart_pending = True
-                            proc = self.proc
-                            proc_pid = proc.pid if proc is not None else -1
+                            proc_pid = self.proc_pid if self.proc_pid is not None else -1
                             logger.warning(
                                 "openconnect transport persistently dead "
                                 "(%d 'Network is unreachable' errors over "
@@ -775,11 +994,11 @@ class PulseSSOPlugin(dbus.service.Object):
 
         threading.Thread(
             target=_drain_stderr,
-            args=(self.proc.stderr, self._openconnect_stderr_tail),
+            args=(os.fdopen(stderr_fd, "rb"), self._openconnect_stderr_tail),
             daemon=True,
         ).start()
 
-        logger.info("openconnect started with PID %d", self.proc.pid)
+        logger.info("openconnect started with PID %d", self.proc_pid)
 
         # Write early grace period timestamp so the dispatcher won't kill
         # a just-spawned openconnect.  Updated again in SetIp4Config with
@@ -793,9 +1012,87 @@ class PulseSSOPlugin(dbus.service.Object):
         # Monitor the process for unexpected exits
         # GLib.child_watch_add will call our callback when the process exits
         self._child_watch_id = GLib.child_watch_add(
-            self.proc.pid, self._on_openconnect_exit
+            self.proc_pid, self._on_openconnect_exit
         )
 
+    def _stop_openconnect(self, on_exit):
+        """
+        Stop the tracked openconnect without blocking the main loop.
+
+        SIGTERM now, SIGKILL if it is still running 5s later. The regular
+        child watch is replaced, so on_exit(exit_code) runs instead of
+        _on_openconnect_exit once GLib has reaped the process.
+        """
+        pid = self.proc_pid
+        self.proc_pid = None
+        if self._child_watch_id is not None:
+            GLib.source_remove(self._child_watch_id)
+            self._child_watch_id = None
+
+        def force_kill():
+            self._openconnect_kill_timeout_id = None
+            logger.warning("Process did not terminate, killing")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            return False
+
+        def on_exited(_pid, status):
+            self._cancel_timer("_openconnect_kill_timeout_id")
+            on_exit(os.waitstatus_to_exitcode(status))
+
+        logger.info("Terminating openconnect process %d", pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass  # Already exited; the child watch below still reaps it
+        GLib.child_watch_add(pid, on_exited)
+        self._set_timer("_openconnect_kill_timeout_id", 5000, force_kill)
+
+    def _restart_via_nm(self, delay_ms: Optional[int] = None):
+        """
+        Stop openconnect and re-activate the connection through NM.
+
+        Used by the Disconnect quirk-rescue and the transport watchdog. The
+        cookie / gateway / servercert / resolve are kept so the re-activation
+        reuses them. Stopped is emitted and the re-activation scheduled only
+        once openconnect has exited, so NM never brings up a new tunnel next
+        to the old one. delay_ms defaults to _reactivation_delay_ms().
+        """
+        self._restart_stop_pending = True
+
+        def on_exit(exit_code):
+            if not self._restart_stop_pending:
+                logger.info(
+                    "openconnect stopped (exit code %s); restart superseded",
+                    exit_code,
+                )
+                return
+            self._restart_stop_pending = False
+            logger.info("openconnect stopped (exit code %s), re-activating", exit_code)
+
+            self._emit_state(ServiceState.Stopped)
+            self._cancel_timer("_reactivation_timeout_id")
+            self._reactivation_retry_count = 0
+            self._reactivation_fallback_done = False
+            self._is_reactivation = True
+            delay = delay_ms
+            if delay is None:
+                delay = self._reactivation_delay_ms()
+                if delay > 500:
+                    logger.info(
+                        "Using extended %dms delay for server session cleanup",
+                        delay,
+                    )
+            self._set_timer(
+                "_reactivation_timeout_id",
+                delay,
+                self._reactivate_vpn_via_nm,
+            )
+
+        self._stop_openconnect(on_exit)
+
     def _restart_dead_transport(self, pid: int) -> bool:
         """Main-loop handler: openconnect's transport is persistently dead.
 
@@ -803,20 +1100,20 @@ class PulseSSOPlugin(dbus.service.Object):
         the gateway on the current interface. Scheduled by the watchdog in
         _drain_stderr via GLib.idle_add when 'Network is unreachable' has
         flooded for >=15s without recovery. Mirrors the Disconnect quirk-
-        rescue teardown to keep the cookie and let _reactivate_vpn_via_nm()
-        bring up a fresh tunnel.
+        rescue: _restart_via_nm keeps the cookie and lets
+        _reactivate_vpn_via_nm() bring up a fresh tunnel.
 
         Returns False so the GLib.idle_add callback does not repeat.
         """
         # Always clear the pending flag so a later real recovery can re-arm.
         self._transport_restart_pending = False
 
-        if (self.proc is None or self.proc.pid != pid
+        if (self.proc_pid is None or self.proc_pid != pid
                 or not self._openconnect_connected):
             logger.info(
                 "Transport watchdog: state changed before restart "
                 "(proc=%s, connected=%s) — no action",
-                self.proc.pid if self.proc else None,
+                self.proc_pid,
                 self._openconnect_connected,
             )
             return False
@@ -827,34 +1124,11 @@ class PulseSSOPlugin(dbus.service.Object):
             pid,
         )
 
-        # Same teardown shape as the Disconnect quirk-rescue: kill openconnect
-        # and null self.proc before _on_openconnect_exit fires (it bails when
-        # proc is None / pid mismatch). Keep cookie / gateway / servercert /
-        # resolve so the re-activation reuses them.
-        try:
-            self.proc.terminate()
-            try:
-                self.proc.wait(timeout=5)
-            except Exception:
-                logger.warning("openconnect did not terminate, killing")
-                self.proc.kill()
-                self.proc.wait()
-        except Exception as e:
-            logger.error("Error terminating openconnect: %s", e)
-        self.proc = None
+        # Same teardown as the Disconnect quirk-rescue, without going through
+        # _on_openconnect_exit. Brief delay so NM observes Stopped and route
+        # changes settle before we ActivateConnection.
         self._openconnect_connected = False
-
-        self.StateChanged(ServiceState.Stopped)
-        if self._reactivation_timeout_id is not None:
-            GLib.source_remove(self._reactivation_timeout_id)
-        self._reactivation_retry_count = 0
-        self._reactivation_fallback_done = False
-        self._is_reactivation = True
-        # Brief delay so NM observes Stopped and route changes settle before
-        # we ActivateConnection.
-        self._reactivation_timeout_id = GLib.timeout_add(
-            1000, self._reactivate_vpn_via_nm
-        )
+        self._restart_via_nm(delay_ms=1000)
         return False
 
     def _on_openconnect_exit(self, pid: int, status: int):
@@ -865,11 +1139,11 @@ class PulseSSOPlugin(dbus.service.Object):
         service handle re-establishing the VPN via nmcli. No restart logic.
         """
         # Only handle exit for the process we're currently tracking
-        if self.proc is None or self.proc.pid != pid:
+        if self.proc_pid is None or self.proc_pid != pid:
             logger.debug(
                 "Ignoring exit for old process PID %d (current: %s)",
                 pid,
-                self.proc.pid if self.proc else "None",
+                self.proc_pid,
             )
             return
 
@@ -900,11 +1174,11 @@ class PulseSSOPlugin(dbus.service.Object):
                 logger.info("openconnect produced no stderr output")
 
         # Clear process reference
-        self.proc = None
+        self.proc_pid = None
         self._child_watch_id = None
 
         # If disconnect was requested, don't do anything — Disconnect() handles cleanup
-        if self._disconnect_requested:
+        if self._phase is PluginPhase.Disconnecting:
             logger.info("Disconnect was requested, not restarting")
             return
 
@@ -917,7 +1191,7 @@ class PulseSSOPlugin(dbus.service.Object):
             )
             self.cookie = None
             self._cookie_is_fresh = False
-            if self.gateway and not self._disconnect_requested:
+            if self.gateway and self._phase is not PluginPhase.Disconnecting:
                 if not was_fresh:
                     # Stale cookie rejected — expected after rebuild/resume.
                     # Don't count toward auth failure limit; just re-auth.
@@ -925,7 +1199,7 @@ class PulseSSOPlugin(dbus.service.Object):
                         "Stale cookie rejected — requesting fresh authentication"
                     )
                     self._needs_post_disruption_delay = True
-                    self._reconnection_pending = True
+                    self._set_phase(PluginPhase.Reauthenticating)
                 else:
                     # Fresh cookie rejected — something is actually wrong.
                     self._auth_failure_count += 1
@@ -935,14 +1209,14 @@ class PulseSSOPlugin(dbus.service.Object):
                             "retrying once",
                             self._auth_failure_count,
                         )
-                        self._reconnection_pending = True
+                        self._set_phase(PluginPhase.Reauthenticating)
                     else:
                         logger.warning(
                             "Fresh cookie rejected %d times — staying stopped "
                             "to avoid re-auth loop",
                             self._auth_failure_count,
                         )
-            self.StateChanged(ServiceState.Stopped)
+            self._emit_state(ServiceState.Stopped)
             return
 
         # Non-auth failure with valid cookie — NM reactive Disconnect() will
@@ -952,6 +1226,7 @@ class PulseSSOPlugin(dbus.service.Object):
             # server-side session cleanup after ungraceful tunnel death.
             self._needs_post_disruption_delay = True
             self._consecutive_restart_failures += 1
+            self._reactivation_failures += 1
             logger.warning(
                 "openconnect exited unexpectedly (attempt %d), "
                 "waiting for NM re-activation...",
@@ -987,12 +1262,12 @@ class PulseSSOPlugin(dbus.service.Object):
                     self.resolve = None
                     self.servercert = None
                     self._cookie_is_fresh = False
-                    if self.gateway and not self._disconnect_requested:
-                        self._reconnection_pending = True
+                    if self.gateway and self._phase is not PluginPhase.Disconnecting:
+                        self._set_phase(PluginPhase.Reauthenticating)
                         self._emit_starting()
                         self._schedule_direct_auth(1000)
                     else:
-                        self.StateChanged(ServiceState.Stopped)
+                        self._emit_state(ServiceState.Stopped)
                     return
 
             if self._consecutive_restart_failures >= 5:
@@ -1005,16 +1280,16 @@ class PulseSSOPlugin(dbus.service.Object):
                 )
                 self._consecutive_restart_failures = 0
                 self.cookie = None
-                if self.gateway and not self._disconnect_requested:
-                    self._reconnection_pending = True
+                if self.gateway and self._phase is not PluginPhase.Disconnecting:
+                    self._set_phase(PluginPhase.Reauthenticating)
                     self._emit_starting()
                     self._schedule_direct_auth(1000)
                 else:
-                    self.StateChanged(ServiceState.Stopped)
+                    self._emit_state(ServiceState.Stopped)
                 return
 
         # Emit Stopped — NM reactive Disconnect() will schedule re-activation
-        self.StateChanged(ServiceState.Stopped)
+        self._emit_state(ServiceState.Stopped)
 
     def _on_idle_quit_timeout(self) -> bool:
         """Quit service after 5 minutes of inactivity (no Connect() received).
@@ -1025,7 +1300,7 @@ class PulseSSOPlugin(dbus.service.Object):
         Returns False to prevent GLib timeout from repeating.
         """
         self._idle_quit_timeout_id = None
-        if self.proc is not None:
+        if self.proc_pid is not None:
             return False  # VPN is running, don't quit
         logger.info("No reconnection after 5 minutes — quitting service")
         self.cookie = None
@@ -1043,27 +1318,21 @@ class PulseSSOPlugin(dbus.service.Object):
         """
         self._reactivation_timeout_id = None
 
-        if self._disconnect_requested:
+        if self._phase is PluginPhase.Disconnecting:
             logger.info("Disconnect requested during delay, aborting VPN re-activation")
             return False
 
         try:
-            bus = dbus.SystemBus()
+            bus = self.connection
 
             # Find VPN connection by service type (our plugin)
-            settings_obj = bus.get_object(
-                "org.freedesktop.NetworkManager",
-                "/org/freedesktop/NetworkManager/Settings",
-            )
-            settings_iface = dbus.Interface(
-                settings_obj, "org.freedesktop.NetworkManager.Settings"
-            )
-
             vpn_conn_path = None
-            for conn_path in settings_iface.ListConnections():
-                conn = bus.get_object("org.freedesktop.NetworkManager", conn_path)
+            for conn_path in self._nm_settings.ListConnections():
+                conn = bus.get_object(
+                    NM_BUS_NAME, conn_path, introspect=False
+                )
                 conn_settings = dbus.Interface(
-                    conn, "org.freedesktop.NetworkManager.Settings.Connection"
+                    conn, NM_SETTINGS_CONNECTION_INTERFACE
                 )
                 s = conn_settings.GetSettings()
                 conn_type = s.get("connection", {}).get("type", "")
@@ -1081,13 +1350,14 @@ class PulseSSOPlugin(dbus.service.Object):
             if not vpn_conn_path:
                 logger.error("No VPN connection found for service %s", NM_DBUS_SERVICE)
                 return False
+            self._nm_conn_path = str(vpn_conn_path)
 
             logger.info("Re-activating VPN connection: %s", vpn_conn_path)
             nm_obj = bus.get_object(
-                "org.freedesktop.NetworkManager",
-                "/org/freedesktop/NetworkManager",
+                NM_BUS_NAME,
+                NM_PATH,
             )
-            nm_iface = dbus.Interface(nm_obj, "org.freedesktop.NetworkManager")
+            nm_iface = dbus.Interface(nm_obj, NM_INTERFACE)
             nm_iface.ActivateConnection(
                 vpn_conn_path,
                 dbus.ObjectPath("/"),   # No specific device (VPN)
@@ -1107,7 +1377,7 @@ class PulseSSOPlugin(dbus.service.Object):
                     "(NM is handling reconnection)"
                 )
                 return False
-            if (not self._disconnect_requested
+            if (self._phase is not PluginPhase.Disconnecting
                     and self._reactivation_retry_count < self._max_reactivation_retries):
                 self._reactivation_retry_count += 1
                 logger.info(
@@ -1116,10 +1386,12 @@ class PulseSSOPlugin(dbus.service.Object):
                     self._reactivation_retry_count,
                     self._max_reactivation_retries,
                 )
-                self._reactivation_timeout_id = GLib.timeout_add(
-                    2000, self._reactivate_vpn_via_nm
+                self._set_timer(
+                    "_reactivation_timeout_id",
+                    2000,
+                    self._reactivate_vpn_via_nm,
                 )
-            elif (not self._disconnect_requested
+            elif (self._phase is not PluginPhase.Disconnecting
                   and not self._reactivation_fallback_done):
                 # Fast retry budget exhausted but NM still hasn't promoted
                 # the new base device. Schedule one more attempt further out
@@ -1134,7 +1406,8 @@ class PulseSSOPlugin(dbus.service.Object):
                     self._max_reactivation_retries,
                     self._reactivation_fallback_delay_ms,
                 )
-                self._reactivation_timeout_id = GLib.timeout_add(
+                self._set_timer(
+                    "_reactivation_timeout_id",
                     self._reactivation_fallback_delay_ms,
                     self._reactivate_vpn_via_nm,
                 )
@@ -1164,8 +1437,8 @@ class PulseSSOPlugin(dbus.service.Object):
                 self._total_auth_launch_failures,
                 reason,
             )
-            self._reconnection_pending = False
-            self.StateChanged(ServiceState.Stopped)
+            self._leave_phase(PluginPhase.Reauthenticating)
+            self._emit_state(ServiceState.Stopped)
             self.Failure(
                 f"VPN auth failed {self._total_auth_launch_failures} times total: {reason}"
             )
@@ -1177,8 +1450,8 @@ class PulseSSOPlugin(dbus.service.Object):
                 self._max_reconnection_retries,
                 reason,
             )
-            self._reconnection_pending = False
-            self.StateChanged(ServiceState.Stopped)
+            self._leave_phase(PluginPhase.Reauthenticating)
+            self._emit_state(ServiceState.Stopped)
             self.Failure(
                 f"VPN reconnection failed after {self._max_reconnection_retries} attempts: {reason}"
             )
@@ -1202,6 +1475,70 @@ class PulseSSOPlugin(dbus.service.Object):
             )
             self._schedule_direct_auth(delay)
 
+    def _reactivation_delay_ms(self) -> int:
+        """
+        Delay before asking NM to re-activate the connection.
+
+        500ms normally. After an ungraceful tunnel death the server needs
+        time to drop the old session: 8s the first time, doubling for each
+        further openconnect failure before the tunnel comes back up
+        (_reactivation_failures), with +/-20% jitter so a persistently
+        failing tunnel doesn't spin in a tight restart loop. The 60s cap is
+        applied after the jitter, so it is a hard ceiling.
+        """
+        if not self._needs_post_disruption_delay:
+            return 500
+        self._needs_post_disruption_delay = False
+        # 8s * 2**3 already exceeds the cap; clamping the exponent keeps a
+        # long failure streak from growing the integer without bound
+        failures = min(max(self._reactivation_failures - 1, 0), 3)
+        delay = 8000 * (2 ** failures) * random.uniform(0.8, 1.2)
+        return int(min(delay, 60_000))
+
+    def _set_phase(self, phase: PluginPhase):
+        """
+        Move to phase. A requested disconnect wins over a re-auth: entering
+        Reauthenticating from Disconnecting is refused until something
+        (Connect, _do_connect) leaves Disconnecting first.
+        """
+        if phase == self._phase:
+            return
+        if (phase is PluginPhase.Reauthenticating
+                and self._phase is PluginPhase.Disconnecting):
+            logger.debug("Ignoring re-auth request: disconnect in progress")
+            return
+        logger.debug("Phase %s -> %s", self._phase.name, phase.name)
+        self._phase = phase
+
+    def _leave_phase(self, phase: PluginPhase):
+        """Return to Idle if currently in phase, otherwise do nothing."""
+        if self._phase is phase:
+            self._set_phase(PluginPhase.Idle)
+
+    def _set_timer(self, slot: str, delay_ms: int, callback):
+        """
+        (Re)arm the one-shot GLib timeout whose source ID lives in self.<slot>.
+
+        Any timer already in the slot is removed first, so a slot never holds
+        more than one live source. The callback clears the slot itself and
+        returns False. A zero delay uses an idle source instead, so pending
+        D-Bus traffic (e.g. the reply to the method that scheduled it) is
+        dispatched first.
+        """
+        self._cancel_timer(slot)
+        if delay_ms <= 0:
+            source_id = GLib.idle_add(callback)
+        else:
+            source_id = GLib.timeout_add(delay_ms, callback)
+        setattr(self, slot, source_id)
+
+    def _cancel_timer(self, slot: str):
+        """Remove the pending GLib timeout in self.<slot>, if any."""
+        source_id = getattr(self, slot)
+        if source_id is not None:
+            GLib.source_remove(source_id)
+            setattr(self, slot, None)
+
     def _schedule_direct_auth(self, delay_ms: int):
         """
         Schedule the direct-auth helper with the provided delay, replacing any existing timer.
@@ -1209,18 +1546,11 @@ class PulseSSOPlugin(dbus.service.Object):
         if delay_ms < 0:
             delay_ms = 0
 
-        if self._direct_auth_timeout_id is not None:
-            GLib.source_remove(self._direct_auth_timeout_id)
-
-        self._direct_auth_timeout_id = GLib.timeout_add(
-            delay_ms, self._launch_direct_auth
-        )
+        self._set_timer("_direct_auth_timeout_id", delay_ms, self._launch_direct_auth)
 
     def _cancel_direct_auth_timer(self):
         """Cancel any pending direct-auth timeout."""
-        if self._direct_auth_timeout_id is not None:
-            GLib.source_remove(self._direct_auth_timeout_id)
-            self._direct_auth_timeout_id = None
+        self._cancel_timer("_direct_auth_timeout_id")
 
     def _kill_auth_dialog(self):
         """Kill any running auth-dialog subprocess and the CEF browser.
@@ -1266,19 +1596,17 @@ class PulseSSOPlugin(dbus.service.Object):
             self._auth_unit_user = None
             self._auth_unit_uses_machine = False
 
-        # Layer 2 — SIGTERM systemd-run (cooperative path).
-        proc = self._auth_dialog_proc
-        if proc is not None:
-            logger.info("Killing auth-dialog subprocess PID %d", proc.pid)
+        # Layer 2 — SIGTERM systemd-run (cooperative path). No wait here:
+        # the child watch reaps it, and layer 3 SIGKILLs it by name anyway.
+        pid = self._auth_dialog_pid
+        if pid is not None:
+            logger.info("Killing auth-dialog subprocess PID %d", pid)
             try:
-                proc.terminate()
-                try:
-                    proc.wait(timeout=2)
-                except subprocess.TimeoutExpired:
-                    proc.kill()
+                os.kill(pid, signal.SIGTERM)
             except OSError:
                 pass
-            self._auth_dialog_proc = None
+            self._auth_dialog_pid = None
+            self._close_auth_dialog_pipes()
 
         # Layer 3 — SIGKILL by name. Catches stragglers including stale
         # CEF processes from a previous run that were never reaped. Logs
@@ -1303,9 +1631,7 @@ class PulseSSOPlugin(dbus.service.Object):
             except Exception as e:
                 logger.debug("pkill %s failed (non-fatal): %s", pattern, e)
 
-        if self._auth_dialog_timeout_id is not None:
-            GLib.source_remove(self._auth_dialog_timeout_id)
-            self._auth_dialog_timeout_id = None
+        self._cancel_timer("_auth_dialog_timeout_id")
 
         # Tear down the per-session proxy NAT redirect, if any.
         self._clear_proxy_nat()
@@ -1415,7 +1741,15 @@ class PulseSSOPlugin(dbus.service.Object):
         when the auth dialog is active.
         """
         self._last_starting_ts = time.monotonic()
-        self.StateChanged(ServiceState.Starting)
+        self._emit_state(ServiceState.Starting)
+
+    def _emit_state(self, state: ServiceState):
+        """Emit StateChanged unless it repeats the last emitted state."""
+        if state == self._last_emitted_state:
+            logger.debug("StateChanged(%s) suppressed (unchanged)", state.name)
+            return
+        self._last_emitted_state = state
+        self.StateChanged(state)
 
     def _launch_direct_auth(self) -> bool:
         """
@@ -1511,7 +1845,7 @@ class PulseSSOPlugin(dbus.service.Object):
         except Exception:
             pass  # Proceed if route check fails
 
-        if not self._reconnection_pending:
+        if self._phase is not PluginPhase.Reauthenticating:
             logger.debug("Reconnection no longer pending, skipping direct auth")
             return False
 
@@ -1522,8 +1856,8 @@ class PulseSSOPlugin(dbus.service.Object):
                 "Max auth retries (%d) exceeded, giving up",
                 self._max_reconnection_retries,
             )
-            self._reconnection_pending = False
-            self.StateChanged(ServiceState.Stopped)
+            self._leave_phase(PluginPhase.Reauthenticating)
+            self._emit_state(ServiceState.Stopped)
             self.Failure("VPN reconnection failed - please reconnect manually")
             return False
 
@@ -1533,71 +1867,123 @@ class PulseSSOPlugin(dbus.service.Object):
             self._max_reconnection_retries,
         )
 
+        # Find the graphical session via logind; the lookup is asynchronous
+        # and continues in _on_graphical_session
+        self._find_graphical_session(self._on_graphical_session)
+
+        return False
+
+    def _get_logind_manager(self) -> dbus.Interface:
+        """
+        Return the logind Manager proxy, creating it on first use.
+
+        The proxy follows name-owner changes so it survives a logind
+        restart. Raises dbus.DBusException if logind can't be reached;
+        nothing is cached in that case so the next call tries again.
+        """
+        if self._logind_manager is None:
+            self._logind_manager = dbus.Interface(
+                self.connection.get_object(
+                    "org.freedesktop.login1",
+                    "/org/freedesktop/login1",
+                    introspect=False,
+                    follow_name_owner_changes=True,
+                ),
+                "org.freedesktop.login1.Manager",
+            )
+        return self._logind_manager
+
+    def _find_graphical_session(self, callback):
+        """
+        Look up the first graphical (x11/wayland) logind session.
+
+        Calls callback with the session's logind properties (Name, Type,
+        Display, Leader, ...) or with None when there is no graphical
+        session. ListSessions and the per-session GetAll calls are all
+        issued asynchronously, so a slow logind never blocks the main loop.
+        """
+        def on_error(e):
+            if self._phase is not PluginPhase.Reauthenticating:
+                return
+            logger.error("Direct auth failed: logind session lookup: %s", e)
+            self._schedule_auth_retry(f"Direct auth failed: {e}")
+
+        def on_sessions(sessions):
+            # (id, uid, user, seat, object path) per session
+            paths = [session[4] for session in sessions]
+            if not paths:
+                callback(None)
+                return
+
+            results = [None] * len(paths)
+            pending = len(paths)
+
+            def on_props(index, props):
+                nonlocal pending
+                results[index] = props
+                pending -= 1
+                if pending:
+                    return
+                # Keep list order so the choice matches loginctl list-sessions
+                for session_props in results:
+                    if session_props and session_props.get("Type") in ("x11", "wayland"):
+                        callback(session_props)
+                        return
+                callback(None)
+
+            def on_props_error(index, e):
+                logger.debug("Could not read logind session %s: %s", paths[index], e)
+                on_props(index, None)
+
+            for index, path in enumerate(paths):
+                session_obj = self.connection.get_object(
+                    "org.freedesktop.login1", path, introspect=False
+                )
+                session_obj.GetAll(
+                    "org.freedesktop.login1.Session",
+                    dbus_interface=dbus.PROPERTIES_IFACE,
+                    reply_handler=lambda props, i=index: on_props(i, props),
+                    error_handler=lambda e, i=index: on_props_error(i, e),
+                    timeout=5,
+                )
+
         try:
-            # Find graphical session via loginctl
-            result = subprocess.run(
-                ["loginctl", "list-sessions", "--no-legend"],
-                capture_output=True,
-                text=True,
+            self._get_logind_manager().ListSessions(
+                reply_handler=on_sessions,
+                error_handler=on_error,
                 timeout=5,
             )
+        except dbus.DBusException as e:
+            on_error(e)
 
-            user = None
-            session_type = None
-            session_leader = None
-            display = ":0"
-
-            for line in result.stdout.strip().split("\n"):
-                if not line.strip():
-                    continue
-                parts = line.split()
-                if len(parts) >= 1:
-                    session_id = parts[0]
-                    # Get session properties
-                    # Note: --property=A,B,C syntax doesn't work, must use separate flags
-                    show = subprocess.run(
-                        [
-                            "loginctl",
-                            "show-session",
-                            session_id,
-                            "--property=Name",
-                            "--property=Type",
-                            "--property=Display",
-                            "--property=Leader",
-                        ],
-                        capture_output=True,
-                        text=True,
-                        timeout=5,
-                    )
-                    props = {}
-                    for prop_line in show.stdout.strip().split("\n"):
-                        if "=" in prop_line:
-                            k, v = prop_line.split("=", 1)
-                            props[k] = v
-
-                    # Look for graphical session (x11 or wayland)
-                    if props.get("Type") in ("x11", "wayland"):
-                        user = props.get("Name")
-                        session_type = props.get("Type")
-                        session_leader = props.get("Leader")
-                        display = props.get("Display") or ":0"
-                        logger.debug(
-                            "Found graphical session: user=%s, type=%s, display=%s, leader=%s",
-                            user,
-                            session_type,
-                            display,
-                            session_leader,
-                        )
-                        break
+    def _on_graphical_session(self, session):
+        """Continue direct auth once the graphical session lookup completes."""
+        if self._phase is not PluginPhase.Reauthenticating:
+            logger.debug("Reconnection cancelled during session lookup, skipping direct auth")
+            return
 
-            if not user:
+        try:
+            if session is None or not session.get("Name"):
                 logger.error("No graphical session found, will retry")
                 self._schedule_direct_auth(self._reconnection_retry_interval)
-                return False
+                return
+
+            user = str(session["Name"])
+            session_type = str(session["Type"])
+            session_leader = str(int(session.get("Leader", 0)))
+            display = str(session.get("Display", "")) or ":0"
+            logger.debug(
+                "Found graphical session: user=%s, type=%s, display=%s, leader=%s",
+                user,
+                session_type,
+                display,
+                session_leader,
+            )
 
             # Get UID for environment wiring
-            uid = pwd.getpwnam(user).pw_uid
-            user_home = pwd.getpwnam(user).pw_dir
+            pw = self._getpwnam(user)
+            uid = pw.pw_uid
+            user_home = pw.pw_dir
 
             # Default environment values for graphical auth
             runtime_dir = f"/run/user/{uid}"
@@ -1623,16 +2009,16 @@ class PulseSSOPlugin(dbus.service.Object):
                         "System not ready after %d attempts (bus), giving up",
                         self._system_not_ready_count,
                     )
-                    self._reconnection_pending = False
-                    self.StateChanged(ServiceState.Stopped)
+                    self._leave_phase(PluginPhase.Reauthenticating)
+                    self._emit_state(ServiceState.Stopped)
                     self.Failure("VPN auth failed: D-Bus session not available")
-                    return False
+                    return
                 logger.warning(
                     "User bus not reachable at %s, deferring auth launch (retrying in 3s)",
                     bus_path,
                 )
                 self._schedule_direct_auth(3000)
-                return False
+                return
             wayland_display = None
             xauthority = None
 
@@ -1691,7 +2077,7 @@ class PulseSSOPlugin(dbus.service.Object):
             proxy_port = self._pick_free_port()
             if not self._install_proxy_nat(proxy_port):
                 self._schedule_auth_retry("Could not install proxy NAT redirect")
-                return False
+                return
 
             logger.info(
                 "Launching auth-dialog as %s (uid=%d, display=%s, proxy-port=%d)",
@@ -1785,11 +2171,9 @@ class PulseSSOPlugin(dbus.service.Object):
             logger.exception("Direct auth failed: %s", e)
             self._schedule_auth_retry(f"Direct auth failed: {e}")
 
-        return False
-
     def _try_next_auth_launch(self):
         """Try the next auth-dialog launch strategy asynchronously."""
-        if not self._reconnection_pending:
+        if self._phase is not PluginPhase.Reauthenticating:
             logger.debug("Reconnection cancelled, aborting auth launch")
             return
 
@@ -1809,8 +2193,8 @@ class PulseSSOPlugin(dbus.service.Object):
                         "System not ready after %d attempts (strategies), giving up",
                         self._system_not_ready_count,
                     )
-                    self._reconnection_pending = False
-                    self.StateChanged(ServiceState.Stopped)
+                    self._leave_phase(PluginPhase.Reauthenticating)
+                    self._emit_state(ServiceState.Stopped)
                     self.Failure("VPN auth failed: system not ready (D-Bus/CEF)")
                     return
                 logger.info(
@@ -1825,12 +2209,12 @@ class PulseSSOPlugin(dbus.service.Object):
                 logger.warning(
                     "Auth-dialog failed with non-transient error — stopping reconnection"
                 )
-                self._reconnection_pending = False
+                self._leave_phase(PluginPhase.Reauthenticating)
                 try:
                     os.unlink("/run/vpn-auto-reconnect")
                 except FileNotFoundError:
                     pass
-                self.StateChanged(ServiceState.Stopped)
+                self._emit_state(ServiceState.Stopped)
                 self.Failure("VPN authentication cancelled or failed")
             return
 
@@ -1843,20 +2227,30 @@ class PulseSSOPlugin(dbus.service.Object):
         )
 
         try:
-            proc = subprocess.Popen(
+            pid, stdin_fd, stdout_fd, stderr_fd = GLib.spawn_async(
                 launch_cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                flags=GLib.SpawnFlags.SEARCH_PATH | GLib.SpawnFlags.DO_NOT_REAP_CHILD,
+                standard_input=True,
+                standard_output=True,
+                standard_error=True,
             )
 
             # Write input data and close stdin immediately.
             # Non-blocking for small data (< PIPE_BUF = 4096 bytes on Linux).
-            proc.stdin.write(self._auth_input_data)
-            proc.stdin.close()
+            try:
+                os.write(stdin_fd, self._auth_input_data)
+            finally:
+                os.close(stdin_fd)
+
+            # Store the pid so Disconnect() can kill it
+            self._auth_dialog_pid = pid
 
-            # Store the proc so Disconnect() can kill it
-            self._auth_dialog_proc = proc
+            # Collect output while the dialog runs, so a chatty dialog can
+            # never fill a pipe and stall before it exits
+            self._auth_dialog_stdout = bytearray()
+            self._auth_dialog_stderr = bytearray()
+            self._watch_auth_dialog_pipe(stdout_fd, self._auth_dialog_stdout)
+            self._watch_auth_dialog_pipe(stderr_fd, self._auth_dialog_stderr)
 
             # Strategies 0 & 1 use --user --machine, strategy 2 (uid-based) goes
             # to the system manager. Track which so the kill path can pick the
@@ -1865,12 +2259,14 @@ class PulseSSOPlugin(dbus.service.Object):
 
             # Monitor the process asynchronously via GLib
             self._auth_dialog_child_watch_id = GLib.child_watch_add(
-                proc.pid, self._on_auth_dialog_exit
+                pid, self._on_auth_dialog_exit
             )
 
             # Set a timeout for the auth-dialog (300 seconds)
-            self._auth_dialog_timeout_id = GLib.timeout_add(
-                300_000, self._on_auth_dialog_timeout
+            self._set_timer(
+                "_auth_dialog_timeout_id",
+                300_000,
+                self._on_auth_dialog_timeout,
             )
 
         except Exception as e:
@@ -1883,6 +2279,53 @@ class PulseSSOPlugin(dbus.service.Object):
             # Try next strategy via idle callback to avoid deep recursion
             GLib.idle_add(self._try_next_auth_launch)
 
+    def _watch_auth_dialog_pipe(self, fd: int, buf: bytearray):
+        """Append everything readable on fd to buf from the main loop."""
+        os.set_blocking(fd, False)
+        watch_id = GLib.io_add_watch(
+            fd, GLib.PRIORITY_DEFAULT, GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR,
+            self._on_auth_dialog_output,
+        )
+        self._auth_dialog_pipes[fd] = (watch_id, buf)
+
+    def _on_auth_dialog_output(self, fd: int, condition) -> bool:
+        """GLib IO watch: read auth-dialog output, close the pipe on EOF."""
+        _, buf = self._auth_dialog_pipes[fd]
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            return True
+        except OSError:
+            data = b""
+        if data:
+            buf.extend(data)
+            return True
+        # EOF: returning False removes the watch
+        del self._auth_dialog_pipes[fd]
+        os.close(fd)
+        return False
+
+    def _close_auth_dialog_pipes(self, drain: bool = False):
+        """
+        Remove the auth-dialog pipe watches and close the pipes.
+
+        With drain=True, first read whatever is already buffered. The reads
+        are non-blocking: grandchildren that inherited the pipe can keep it
+        open after the dialog itself has exited.
+        """
+        for fd, (watch_id, buf) in self._auth_dialog_pipes.items():
+            GLib.source_remove(watch_id)
+            while drain:
+                try:
+                    data = os.read(fd, 65536)
+                except OSError:
+                    break
+                if not data:
+                    break
+                buf.extend(data)
+            os.close(fd)
+        self._auth_dialog_pipes.clear()
+
     def _on_auth_dialog_timeout(self) -> bool:
         """Called when auth-dialog has been running too long. Kill it."""
         self._auth_dialog_timeout_id = None
@@ -1898,17 +2341,19 @@ class PulseSSOPlugin(dbus.service.Object):
         and either starts openconnect or schedules a retry.
         """
         # Cancel the timeout
-        if self._auth_dialog_timeout_id is not None:
-            GLib.source_remove(self._auth_dialog_timeout_id)
-            self._auth_dialog_timeout_id = None
+        self._cancel_timer("_auth_dialog_timeout_id")
 
         self._auth_dialog_child_watch_id = None
-        proc = self._auth_dialog_proc
-        self._auth_dialog_proc = None
 
-        if proc is None or proc.pid != pid:
+        if self._auth_dialog_pid is None or self._auth_dialog_pid != pid:
             logger.debug("Ignoring exit for unknown auth-dialog PID %d", pid)
             return
+        self._auth_dialog_pid = None
+
+        # The process is dead; take what is left in the pipes
+        self._close_auth_dialog_pipes(drain=True)
+        stdout = bytes(self._auth_dialog_stdout)
+        stderr = bytes(self._auth_dialog_stderr)
 
         # Auth-dialog (and the proxy it spawned) has exited — the per-session
         # NAT redirect is no longer needed. openconnect dials the real gateway
@@ -1917,16 +2362,10 @@ class PulseSSOPlugin(dbus.service.Object):
         self._clear_proxy_nat()
 
         # Check if disconnect was requested while we were waiting
-        if not self._reconnection_pending:
+        if self._phase is not PluginPhase.Reauthenticating:
             logger.info(
                 "Reconnection no longer pending after auth-dialog exit, not retrying"
             )
-            # Clean up pipes
-            try:
-                proc.stdout.close()
-                proc.stderr.close()
-            except Exception:
-                pass
             return
 
         # Get exit code
@@ -1937,18 +2376,6 @@ class PulseSSOPlugin(dbus.service.Object):
         else:
             exit_code = status
 
-        # Read stdout/stderr now that process has exited.
-        # Safe because the process is dead and data is in kernel pipe buffers.
-        try:
-            stdout = proc.stdout.read()
-            stderr = proc.stderr.read()
-            proc.stdout.close()
-            proc.stderr.close()
-        except Exception as e:
-            logger.error("Failed to read auth-dialog output: %s", e)
-            self._schedule_auth_retry("Failed to read auth-dialog output")
-            return
-
         if exit_code != 0:
             stderr_text = stderr.decode(errors="replace")
             logger.error(
@@ -2002,26 +2429,15 @@ class PulseSSOPlugin(dbus.service.Object):
                 self._try_next_auth_launch()
             return
 
-        # Parse cookie from stdout (protocol: key\nvalue\nkey\nvalue...)
+        # Parse cookie from stdout (protocol: key\nvalue\nkey\nvalue...).
+        # Every auth-dialog writes strict pairs, so pair lines up directly.
         lines = stdout.decode().strip().split("\n")
-        cookie = None
-        gwcert = None
-        resolve = None
-        i = 0
-        while i < len(lines):
-            if lines[i] == "cookie" and i + 1 < len(lines):
-                cookie = lines[i + 1]
-                i += 2
-            elif lines[i] == "gwcert" and i + 1 < len(lines):
-                gwcert = lines[i + 1]
-                i += 2
-            elif lines[i] == "resolve" and i + 1 < len(lines):
-                # "HOST:IP" — emitted by the browser-auth dialog so we can
-                # tell openconnect to bypass /etc/hosts.
-                resolve = lines[i + 1]
-                i += 2
-            else:
-                i += 1
+        fields = dict(zip(lines[0::2], lines[1::2]))
+        cookie = fields.get("cookie")
+        gwcert = fields.get("gwcert")
+        # "HOST:IP" — emitted by the browser-auth dialog so we can
+        # tell openconnect to bypass /etc/hosts.
+        resolve = fields.get("resolve")
 
         if not cookie:
             logger.error("No cookie in auth-dialog output: %s", stdout.decode())
@@ -2041,7 +2457,7 @@ class PulseSSOPlugin(dbus.service.Object):
             return
 
         # Check disconnect again (could have been requested during output parsing)
-        if not self._reconnection_pending:
+        if self._phase is not PluginPhase.Reauthenticating:
             logger.info("Disconnect requested, discarding auth result")
             return
 
@@ -2066,7 +2482,7 @@ class PulseSSOPlugin(dbus.service.Object):
         try:
             self._start_openconnect()
             # Only clear reconnection state AFTER openconnect starts successfully
-            self._reconnection_pending = False
+            self._leave_phase(PluginPhase.Reauthenticating)
             self._reconnection_retry_count = 0
             # Note: _auth_failure_count is intentionally NOT reset here.
             # It tracks fresh-cookie exit-code-2 failures since the last
@@ -2090,21 +2506,29 @@ class PulseSSOPlugin(dbus.service.Object):
         bypass NM's secrets agent system (which doesn't support our VPN type).
         """
         connection = convert_dbus_types(connection)
-        logger.info("Connect called with connection: %s", connection)
 
         # Remember which connection was activated for re-activation
         conn_uuid = connection.get("connection", {}).get("uuid", "")
+        logger.info(
+            "Connect called for %s (uuid=%s, has_cookie=%s)",
+            connection.get("connection", {}).get("id", "?"),
+            conn_uuid,
+            bool(extract_vpn_fields(connection)[1]),
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Connect connection: %s", redact_secrets(connection))
         if conn_uuid:
             self._active_conn_uuid = conn_uuid
 
         # Cancel idle quit timer — we got a Connect call
-        if self._idle_quit_timeout_id is not None:
-            GLib.source_remove(self._idle_quit_timeout_id)
-            self._idle_quit_timeout_id = None
-        self._disconnect_requested = False
+        self._cancel_timer("_idle_quit_timeout_id")
+        self._connect_generation += 1
+        self._leave_phase(PluginPhase.Disconnecting)
+        self._last_emitted_state = None
 
-        vpn_secrets = connection.get("vpn", {}).get("secrets", {})
-        if not vpn_secrets.get("cookie"):
+        gateway, cookie, _, _ = extract_vpn_fields(connection)
+        self._note_nm_secrets(cookie)
+        if not cookie:
             # No cookie from NM — check if we have one internally from previous connection
             if self.cookie:
                 logger.info("No cookie from NM, using internally-stored cookie")
@@ -2120,20 +2544,15 @@ class PulseSSOPlugin(dbus.service.Object):
             # No cookie at all - launch direct auth (browser popup)
             logger.info("No cookie in Connect, launching direct auth")
 
-            # Extract gateway from connection
-            vpn_data = connection.get("vpn", {}).get("data", {})
-            gateway = vpn_data.get("gateway", "")
             if not gateway:
                 raise LaunchFailedError("No gateway specified in VPN configuration")
 
-            # Ensure gateway has https:// prefix
-            if not gateway.startswith("http://") and not gateway.startswith("https://"):
-                gateway = f"https://{gateway}"
+            gateway = ensure_https(gateway)
 
             # Store connection and gateway for use after auth completes
             self.pending_connection = connection
             self.gateway = gateway
-            self._reconnection_pending = True
+            self._set_phase(PluginPhase.Reauthenticating)
             self._reconnection_retry_count = 0
 
             self._emit_starting()
@@ -2157,29 +2576,32 @@ class PulseSSOPlugin(dbus.service.Object):
         which avoids plasma-nm showing a generic secrets dialog.
         """
         connection = convert_dbus_types(connection)
-        logger.info("ConnectInteractive called with connection: %s", connection)
 
         # Remember which connection was activated for re-activation
         conn_uuid = connection.get("connection", {}).get("uuid", "")
+        logger.info(
+            "ConnectInteractive called for %s (uuid=%s, has_cookie=%s)",
+            connection.get("connection", {}).get("id", "?"),
+            conn_uuid,
+            bool(extract_vpn_fields(connection)[1]),
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("ConnectInteractive connection: %s", redact_secrets(connection))
         if conn_uuid:
             self._active_conn_uuid = conn_uuid
 
         # Cancel idle quit timer — we got a Connect call
-        if self._idle_quit_timeout_id is not None:
-            GLib.source_remove(self._idle_quit_timeout_id)
-            self._idle_quit_timeout_id = None
-        self._disconnect_requested = False
+        self._cancel_timer("_idle_quit_timeout_id")
+        self._connect_generation += 1
+        self._leave_phase(PluginPhase.Disconnecting)
+        self._last_emitted_state = None
 
         # Store connection for later use
         self.pending_connection = connection
 
-        # Extract secrets
-        vpn_secrets = connection.get("vpn", {}).get("secrets", {})
-        cookie = vpn_secrets.get("cookie", "")
-
-        # Extract gateway for direct auth
-        vpn_data = connection.get("vpn", {}).get("data", {})
-        gateway = vpn_data.get("gateway", "")
+        # Extract secrets, and the gateway for direct auth
+        gateway, cookie, _, _ = extract_vpn_fields(connection)
+        self._note_nm_secrets(cookie)
 
         if not cookie:
             # No cookie from NM — check if we have one internally from previous connection
@@ -2200,24 +2622,22 @@ class PulseSSOPlugin(dbus.service.Object):
             if not gateway:
                 raise LaunchFailedError("No gateway specified in VPN configuration")
 
-            # Ensure gateway has https:// prefix
-            if not gateway.startswith("http://") and not gateway.startswith("https://"):
-                gateway = f"https://{gateway}"
+            gateway = ensure_https(gateway)
 
             self.gateway = gateway
 
             # Check if auth is already running — don't launch duplicate
-            if self._auth_dialog_proc is not None or self._direct_auth_timeout_id is not None:
+            if self._auth_dialog_pid is not None or self._direct_auth_timeout_id is not None:
                 logger.info(
                     "Auth dialog already running, not launching duplicate "
                     "(will use result from current auth)"
                 )
-                self._reconnection_pending = True
+                self._set_phase(PluginPhase.Reauthenticating)
                 self._reconnection_retry_count = 0
                 self._emit_starting()
                 return
 
-            self._reconnection_pending = True
+            self._set_phase(PluginPhase.Reauthenticating)
             self._reconnection_retry_count = 0
             self._emit_starting()
             self._schedule_direct_auth(0)
@@ -2238,10 +2658,10 @@ class PulseSSOPlugin(dbus.service.Object):
         This is necessary because KDE's secrets agent (and others) don't support
         our custom pulse-sso VPN type.
         """
-        settings = convert_dbus_types(settings)
-        vpn_secrets = settings.get("vpn", {}).get("secrets", {})
+        _, cookie, _, _ = extract_vpn_fields(settings)
+        self._note_nm_secrets(cookie)
 
-        if vpn_secrets.get("cookie"):
+        if cookie:
             logger.info("NeedSecrets: have cookie, no secrets needed")
         else:
             logger.info(
@@ -2260,42 +2680,48 @@ class PulseSSOPlugin(dbus.service.Object):
         when NM detects the tunnel (tun0) has died.
 
         Key insight: when openconnect dies, _on_openconnect_exit() fires FIRST
-        (via SIGCHLD/GLib child_watch), setting self.proc = None. NM's reactive
+        (via SIGCHLD/GLib child_watch), setting self.proc_pid = None. NM's reactive
         Disconnect() arrives later over D-Bus. When the USER clicks disconnect,
-        NM calls Disconnect() while self.proc is still running (not None).
+        NM calls Disconnect() while self.proc_pid is still running (not None).
 
         - proc is not None → user-initiated disconnect → remove flag file, quit
         - proc is None → reactive disconnect → stay alive with cookie for reconnect
         """
         logger.info("Disconnect called")
 
+        if self._shutdown_pending:
+            # openconnect is already being stopped (proc_pid is None by now)
+            # and the loop quits once that finishes; don't re-run teardown
+            logger.info("Disconnect called during shutdown — already stopping")
+            return
+
         # If openconnect has already exited (killed externally or network failure),
         # this is NM's reactive cleanup after the tunnel died.
         # Key insight: when openconnect dies externally, _on_openconnect_exit()
-        # fires FIRST (via SIGCHLD/GLib child_watch), setting self.proc = None.
+        # fires FIRST (via SIGCHLD/GLib child_watch), setting self.proc_pid = None.
         # NM's reactive Disconnect() arrives later over D-Bus.
         # When the USER clicks disconnect, NM calls Disconnect() while
-        # self.proc is still running (not None).
+        # self.proc_pid is still running (not None).
         #
         # We must cooperate with NM's teardown (emit Stopped) then re-activate
         # through NM's proper ActivateConnection flow. If we return early,
         # NM tears down routes anyway but our scheduled restart creates a
         # new tunnel that NM doesn't know about → zombie VPN.
-        if self.proc is None and not self._disconnect_requested:
-            # If re-activation is already pending, this is a second Disconnect()
-            # call — treat as user-initiated disconnect
-            if self._reactivation_timeout_id is not None:
+        if self.proc_pid is None and self._phase is not PluginPhase.Disconnecting:
+            # If re-activation is already pending (or openconnect is being
+            # stopped for one), this is a second Disconnect() call — treat
+            # as user-initiated disconnect
+            if self._reactivation_timeout_id is not None or self._restart_stop_pending:
                 logger.info("Disconnect called during pending re-activation — "
                             "treating as user disconnect")
-                GLib.source_remove(self._reactivation_timeout_id)
-                self._reactivation_timeout_id = None
-                self._disconnect_requested = True
+                self._cancel_timer("_reactivation_timeout_id")
+                self._restart_stop_pending = False
+                self._set_phase(PluginPhase.Disconnecting)
 
                 # Tear down auth dialog / CEF and any scheduled launch so
                 # nothing survives the quit.
                 self._cancel_direct_auth_timer()
                 self._kill_auth_dialog()
-                self._reconnection_pending = False
 
                 # Remove auto-reconnect flag so external service does not retry
                 try:
@@ -2309,9 +2735,7 @@ class PulseSSOPlugin(dbus.service.Object):
                 self.resolve = None
                 self.pending_connection = None
 
-                self._clear_cached_secrets()
-                self.StateChanged(ServiceState.Stopped)
-                self.loop.quit()
+                self._shutdown("user disconnect during pending re-activation")
                 return
 
             # If auth dialog is running or scheduled, distinguish between:
@@ -2325,7 +2749,7 @@ class PulseSSOPlugin(dbus.service.Object):
             #       the auth flow, kill CEF, stop the service.
             # We use elapsed-time-since-last-Starting as the discriminator:
             # NM's quirk is fast (sub-second), users react in seconds.
-            if self._auth_dialog_proc is not None or self._direct_auth_timeout_id is not None:
+            if self._auth_dialog_pid is not None or self._direct_auth_timeout_id is not None:
                 if self._last_starting_ts:
                     elapsed = time.monotonic() - self._last_starting_ts
                 else:
@@ -2344,24 +2768,22 @@ class PulseSSOPlugin(dbus.service.Object):
                         "preserving auth flow, scheduling re-activation for NM",
                         elapsed,
                     )
-                    self.StateChanged(ServiceState.Stopped)
-                    if self._reactivation_timeout_id is not None:
-                        GLib.source_remove(self._reactivation_timeout_id)
+                    self._emit_state(ServiceState.Stopped)
+                    self._cancel_timer("_reactivation_timeout_id")
                     self._reactivation_retry_count = 0
                     self._reactivation_fallback_done = False
                     self._is_reactivation = True
-                    if self._needs_post_disruption_delay:
-                        delay = 8000  # 8s for server session cleanup
-                        self._needs_post_disruption_delay = False
+                    delay = self._reactivation_delay_ms()
+                    if delay > 500:
                         logger.info(
                             "Using extended %dms delay for server session cleanup "
                             "(auth dialog active)",
                             delay,
                         )
-                    else:
-                        delay = 500
-                    self._reactivation_timeout_id = GLib.timeout_add(
-                        delay, self._reactivate_vpn_via_nm
+                    self._set_timer(
+                        "_reactivation_timeout_id",
+                        delay,
+                        self._reactivate_vpn_via_nm,
                     )
                     return
 
@@ -2373,7 +2795,7 @@ class PulseSSOPlugin(dbus.service.Object):
                     "treating as user disconnect, cancelling auth",
                     elapsed,
                 )
-                self._disconnect_requested = True
+                self._set_phase(PluginPhase.Disconnecting)
 
                 # Remove auto-reconnect flag so external service does not retry
                 try:
@@ -2382,14 +2804,10 @@ class PulseSSOPlugin(dbus.service.Object):
                     pass
 
                 # Cancel any pending re-activation timer
-                if self._reactivation_timeout_id is not None:
-                    GLib.source_remove(self._reactivation_timeout_id)
-                    self._reactivation_timeout_id = None
+                self._cancel_timer("_reactivation_timeout_id")
 
                 # Cancel idle-quit timer if armed
-                if self._idle_quit_timeout_id is not None:
-                    GLib.source_remove(self._idle_quit_timeout_id)
-                    self._idle_quit_timeout_id = None
+                self._cancel_timer("_idle_quit_timeout_id")
 
                 # Stop auth flow: cancel scheduled launches and kill running
                 # dialog/CEF (systemd-run cgroup cleanup takes CEF down with
@@ -2399,11 +2817,11 @@ class PulseSSOPlugin(dbus.service.Object):
 
                 # Reset auth/retry counters tied to this connection lifecycle.
                 # _total_auth_launch_failures is intentionally cumulative, do NOT reset.
-                self._reconnection_pending = False
                 self._reconnection_retry_count = 0
                 self._reactivation_retry_count = 0
                 self._reactivation_fallback_done = False
                 self._consecutive_restart_failures = 0
+                self._reactivation_failures = 0
                 self._auth_failure_count = 0
                 self._needs_post_disruption_delay = False
 
@@ -2414,12 +2832,9 @@ class PulseSSOPlugin(dbus.service.Object):
                 self.resolve = None
                 self.pending_connection = None
 
-                # Drop any cached secret in NM so a future Connect prompts fresh auth
-                self._clear_cached_secrets()
-
-                self.StateChanged(ServiceState.Stopped)
-                logger.info("Stopping service event loop (user disconnect during auth)")
-                self.loop.quit()
+                # Drop any cached secret in NM so a future Connect prompts
+                # fresh auth, then stop the event loop
+                self._shutdown("user disconnect during auth")
                 return
 
             logger.info("Disconnect called but openconnect already exited — "
@@ -2431,14 +2846,15 @@ class PulseSSOPlugin(dbus.service.Object):
 
             # Determine if we should re-activate after NM teardown
             should_reactivate = bool(
-                self.gateway and (self.cookie or self._reconnection_pending)
+                self.gateway
+                and (self.cookie or self._phase is PluginPhase.Reauthenticating)
             )
 
             # Reset reconnection state (will be re-set in Connect() if needed)
-            self._reconnection_pending = False
+            self._leave_phase(PluginPhase.Reauthenticating)
 
             # Tell NM we stopped — lets NM properly tear down routes
-            self.StateChanged(ServiceState.Stopped)
+            self._emit_state(ServiceState.Stopped)
 
             # Schedule VPN re-activation through NM (after teardown completes)
             if should_reactivate:
@@ -2446,24 +2862,23 @@ class PulseSSOPlugin(dbus.service.Object):
                 self._reactivation_retry_count = 0
                 self._reactivation_fallback_done = False
                 self._is_reactivation = True
-                if self._needs_post_disruption_delay:
-                    delay = 8000  # 8s for server session cleanup
-                    self._needs_post_disruption_delay = False
+                delay = self._reactivation_delay_ms()
+                if delay > 500:
                     logger.info(
                         "Using extended %dms delay for server session cleanup",
                         delay,
                     )
-                else:
-                    delay = 500
-                self._reactivation_timeout_id = GLib.timeout_add(
-                    delay, self._reactivate_vpn_via_nm
+                self._set_timer(
+                    "_reactivation_timeout_id",
+                    delay,
+                    self._reactivate_vpn_via_nm,
                 )
             else:
                 logger.info("No credentials for re-activation, staying stopped")
-                if self._idle_quit_timeout_id is not None:
-                    GLib.source_remove(self._idle_quit_timeout_id)
-                self._idle_quit_timeout_id = GLib.timeout_add(
-                    300000, self._on_idle_quit_timeout
+                self._set_timer(
+                    "_idle_quit_timeout_id",
+                    300000,
+                    self._on_idle_quit_timeout,
                 )
 
             return  # Don't quit — keep service alive for re-activation
@@ -2473,18 +2888,18 @@ class PulseSSOPlugin(dbus.service.Object):
         # StateChanged(Starting) during reconnection.  If we quit here, NM
         # won't be able to call Connect() when the external service triggers
         # nmcli connection up.
-        if self._reconnection_pending and self.proc is None:
+        if self._phase is PluginPhase.Reauthenticating and self.proc_pid is None:
             logger.info(
                 "Disconnect during reconnection pending — "
                 "cleaning up auth state but keeping service alive"
             )
             self._cancel_direct_auth_timer()
             self._kill_auth_dialog()
-            self._reconnection_pending = False
-            self.StateChanged(ServiceState.Stopped)
+            self._leave_phase(PluginPhase.Reauthenticating)
+            self._emit_state(ServiceState.Stopped)
             return
 
-        if self.proc is not None:
+        if self.proc_pid is not None:
             # NM's activation-cycle quirk: it reflexively fires Disconnect()
             # within a few hundred ms of the StateChanged(Starting) we emit
             # when launching openconnect for a (re)activation. If openconnect
@@ -2510,40 +2925,11 @@ class PulseSSOPlugin(dbus.service.Object):
                     "(%d/%d)",
                     elapsed, self._quirk_rescue_count, self.MAX_QUIRK_RESCUES,
                 )
-                # Tear down the just-launched openconnect. Nulling self.proc
-                # before the GLib child-watch fires makes _on_openconnect_exit
-                # no-op (it bails when proc is None / pid mismatch).
-                logger.info("Terminating openconnect process %d", self.proc.pid)
-                self.proc.terminate()
-                try:
-                    self.proc.wait(timeout=5)
-                except Exception:
-                    logger.warning("Process did not terminate, killing")
-                    self.proc.kill()
-                    self.proc.wait()
-                self.proc = None
-
-                # Keep self.cookie / gateway / servercert / resolve so the
-                # re-activation reuses the cookie instead of re-prompting auth.
+                # Tear down the just-launched openconnect without waiting on
+                # it here; _on_openconnect_exit never sees this exit. The
+                # cookie is kept so the re-activation doesn't re-prompt auth.
                 # Do NOT remove /run/vpn-auto-reconnect and do NOT quit.
-                self.StateChanged(ServiceState.Stopped)
-                if self._reactivation_timeout_id is not None:
-                    GLib.source_remove(self._reactivation_timeout_id)
-                self._reactivation_retry_count = 0
-                self._reactivation_fallback_done = False
-                self._is_reactivation = True
-                if self._needs_post_disruption_delay:
-                    delay = 8000
-                    self._needs_post_disruption_delay = False
-                    logger.info(
-                        "Using extended %dms delay for server session cleanup",
-                        delay,
-                    )
-                else:
-                    delay = 500
-                self._reactivation_timeout_id = GLib.timeout_add(
-                    delay, self._reactivate_vpn_via_nm
-                )
+                self._restart_via_nm()
                 return
 
             if in_quirk_window:
@@ -2557,25 +2943,12 @@ class PulseSSOPlugin(dbus.service.Object):
                     "auto-reconnect flag for external recovery",
                     elapsed, self._quirk_rescue_count,
                 )
-                logger.info("Terminating openconnect process %d", self.proc.pid)
-                self.proc.terminate()
-                try:
-                    self.proc.wait(timeout=5)
-                except Exception:
-                    self.proc.kill()
-                    self.proc.wait()
-                self.proc = None
-                self._clear_cached_secrets()
-                self.StateChanged(ServiceState.Stopped)
-                logger.info(
-                    "Stopping service event loop (quirk-rescue budget exhausted)"
-                )
-                self.loop.quit()
+                self._shutdown("quirk-rescue budget exhausted", stop_openconnect=True)
                 return
 
             # User/NM initiated disconnect while VPN is running
             logger.info("User-initiated disconnect — removing auto-reconnect flag")
-            self._disconnect_requested = True
+            self._set_phase(PluginPhase.Disconnecting)
 
             # Remove flag file so external service doesn't reconnect
             try:
@@ -2586,82 +2959,242 @@ class PulseSSOPlugin(dbus.service.Object):
             # Cancel any pending auth
             self._cancel_direct_auth_timer()
             self._kill_auth_dialog()
-            self._reconnection_pending = False
             self._needs_post_disruption_delay = False
 
             # Cancel any pending re-activation
-            if self._reactivation_timeout_id is not None:
-                GLib.source_remove(self._reactivation_timeout_id)
-                self._reactivation_timeout_id = None
+            self._cancel_timer("_reactivation_timeout_id")
 
             # Clear credentials and pending state to prevent restart
             self.cookie = None
             self.gateway = None
             self.pending_connection = None
 
-            # Kill openconnect
-            logger.info("Terminating openconnect process %d", self.proc.pid)
-            self.proc.terminate()
-            try:
-                self.proc.wait(timeout=5)
-            except Exception:
-                logger.warning("Process did not terminate, killing")
-                self.proc.kill()
-                self.proc.wait()
+            # Kill openconnect, then exit the service once NM's cached
+            # secrets are cleared - NM will restart it when needed. This
+            # continues asynchronously so Disconnect() returns to NM without
+            # waiting for the process.
+            self._shutdown("user disconnect", stop_openconnect=True)
+        else:
+            # Fallback: reactive disconnect with disconnect already requested
+            logger.info("Reactive disconnect (disconnect_requested) — stopping")
+            self._emit_state(ServiceState.Stopped)
+            self.loop.quit()
 
-            logger.info("openconnect exit code: %d", self.proc.returncode)
-            self.proc = None
+    def _shutdown(self, reason: str, stop_openconnect: bool = False):
+        """
+        Stop openconnect if asked, clear NM's cached secrets, then emit
+        Stopped and quit the event loop.
+
+        Same order as a synchronous teardown, but every step is asynchronous,
+        so the service stays on the bus in the meantime. It is held in
+        Disconnecting so nothing restarts, and further Disconnect() calls are
+        ignored (see _shutdown_pending). If NM sends a new Connect before the
+        teardown completes, the secrets are left alone and the service stays
+        up for the new connection.
+        """
+        self._set_phase(PluginPhase.Disconnecting)
+        generation = self._shutdown_generation = self._connect_generation
 
-            self._clear_cached_secrets()
-            self.StateChanged(ServiceState.Stopped)
+        def superseded():
+            return self._connect_generation != generation
 
-            # Exit the service - NM will restart it when needed
-            logger.info("Stopping service event loop")
+        def finish():
+            if superseded():
+                logger.info("Connect arrived during shutdown (%s), staying up", reason)
+                return
+            self._shutdown_generation = None
+            self._emit_state(ServiceState.Stopped)
+            logger.info("Stopping service event loop (%s)", reason)
             self.loop.quit()
+
+        def clear_secrets():
+            if superseded():
+                finish()
+                return
+            self._clear_cached_secrets(on_done=finish, abort=superseded)
+
+        if stop_openconnect:
+            def on_exit(exit_code):
+                logger.info("openconnect exit code: %s", exit_code)
+                clear_secrets()
+
+            self._stop_openconnect(on_exit)
         else:
-            # Fallback: reactive disconnect with disconnect already requested
-            logger.info("Reactive disconnect (disconnect_requested) — stopping")
-            self.StateChanged(ServiceState.Stopped)
-            self.loop.quit()
+            clear_secrets()
 
-    def _clear_cached_secrets(self):
-        """Clear cached VPN secrets from NetworkManager via D-Bus."""
-        try:
-            # Get the connection settings via D-Bus
-            bus = dbus.SystemBus()
-            nm = bus.get_object(
-                "org.freedesktop.NetworkManager",
-                "/org/freedesktop/NetworkManager/Settings",
+    @property
+    def _shutdown_pending(self) -> bool:
+        """True while a _shutdown is in flight and not superseded by Connect."""
+        return self._shutdown_generation == self._connect_generation
+
+    def _clear_cached_secrets(self, on_done=None, abort=None):
+        """
+        Clear cached VPN secrets from NetworkManager via D-Bus.
+
+        The connection is located by the UUID that was activated
+        (GetConnectionByUuid, one small reply) and only falls back to
+        scanning ListConnections + GetSettings when that is unknown or fails.
+        Every call is issued asynchronously so teardown never blocks the
+        main loop. Once the connection's object path is known it is
+        remembered in self._nm_conn_path and later calls go straight to
+        ClearSecrets. Nothing is sent at all unless NM has delivered a cookie
+        in this service's lifetime. If abort is given and returns True by the
+        time the connection is found, ClearSecrets is not sent. on_done, if
+        given, is called once this finishes, whether or not anything was
+        cleared.
+        """
+        def finish():
+            if on_done is not None:
+                on_done()
+
+        if not self._nm_has_secrets:
+            logger.debug("NM never delivered a cookie, no cached secrets to clear")
+            finish()
+            return
+
+        def guarded(handler):
+            # dbus-python only prints exceptions raised in reply handlers, so
+            # a bug here would otherwise leave on_done (loop.quit) uncalled
+            @wraps(handler)
+            def wrapper(*args):
+                try:
+                    handler(*args)
+                except Exception:
+                    logger.exception("Unexpected error while clearing secrets")
+                    finish()
+            return wrapper
+
+        def on_error(e):
+            logger.warning("Failed to clear secrets via D-Bus: %s", e)
+            finish()
+
+        def on_cleared():
+            self._nm_has_secrets = False
+            logger.info("Cleared cached VPN secrets via D-Bus")
+            finish()
+
+        def clear_secrets(conn_path, error_handler):
+            if abort is not None and abort():
+                logger.info("Not clearing VPN secrets: a new connection started")
+                finish()
+                return
+            self._call_nm_connection(
+                conn_path, "ClearSecrets", on_cleared, error_handler
             )
-            settings_iface = dbus.Interface(
-                nm, "org.freedesktop.NetworkManager.Settings"
+
+        @guarded
+        def on_connections(paths):
+            if not paths:
+                logger.warning("Could not find VPN connection to clear secrets")
+                finish()
+                return
+
+            results = [None] * len(paths)
+            pending = len(paths)
+
+            @guarded
+            def on_settings(index, settings):
+                nonlocal pending
+                results[index] = settings
+                pending -= 1
+                if pending:
+                    return
+                # Find our connection by service type, first match in list order
+                for conn_path, conn_settings in zip(paths, results):
+                    if not conn_settings:
+                        continue
+                    conn_type = conn_settings.get("connection", {}).get("type", "")
+                    vpn_service = conn_settings.get("vpn", {}).get("service-type", "")
+                    if conn_type == "vpn" and vpn_service == NM_DBUS_SERVICE:
+                        self._nm_conn_path = conn_path
+                        clear_secrets(conn_path, on_error)
+                        return
+                logger.warning("Could not find VPN connection to clear secrets")
+                finish()
+
+            def on_settings_error(index, e):
+                logger.debug("Could not read NM connection %s: %s", paths[index], e)
+                on_settings(index, None)
+
+            for index, conn_path in enumerate(paths):
+                self._call_nm_connection(
+                    conn_path,
+                    "GetSettings",
+                    lambda settings, i=index: on_settings(i, settings),
+                    lambda e, i=index: on_settings_error(i, e),
+                )
+
+        def list_connections():
+            try:
+                self._nm_settings.ListConnections(
+                    reply_handler=on_connections,
+                    error_handler=on_error,
+                    timeout=5,
+                )
+            except dbus.DBusException as e:
+                on_error(e)
+
+        def on_connection_by_uuid(conn_path):
+            self._nm_conn_path = str(conn_path)
+            clear_secrets(conn_path, on_error)
+
+        def on_uuid_error(e):
+            logger.debug(
+                "GetConnectionByUuid(%s) failed, scanning: %s", self._active_conn_uuid, e
             )
+            list_connections()
 
-            # Find our connection by service type
-            for conn_path in settings_iface.ListConnections():
-                conn = bus.get_object("org.freedesktop.NetworkManager", conn_path)
-                conn_settings = dbus.Interface(
-                    conn, "org.freedesktop.NetworkManager.Settings.Connection"
+        def find_connection():
+            if not self._active_conn_uuid:
+                list_connections()
+                return
+            try:
+                self._nm_settings.GetConnectionByUuid(
+                    self._active_conn_uuid,
+                    reply_handler=on_connection_by_uuid,
+                    error_handler=on_uuid_error,
+                    timeout=5,
                 )
-                settings = conn_settings.GetSettings()
+            except dbus.DBusException as e:
+                on_uuid_error(e)
 
-                conn_type = settings.get("connection", {}).get("type", "")
-                vpn_service = settings.get("vpn", {}).get("service-type", "")
-                if conn_type == "vpn" and vpn_service == NM_DBUS_SERVICE:
-                    # Clear secrets by calling ClearSecrets()
-                    conn_settings.ClearSecrets()
-                    logger.info("Cleared cached VPN secrets via D-Bus")
-                    return
+        def on_cached_path_error(e):
+            # The connection was probably deleted or re-created; look it up again
+            logger.debug("Cached NM connection %s failed: %s", self._nm_conn_path, e)
+            self._nm_conn_path = None
+            find_connection()
 
-            logger.warning("Could not find VPN connection to clear secrets")
-        except Exception as e:
-            logger.warning("Failed to clear secrets via D-Bus: %s", e)
+        if self._nm_conn_path:
+            clear_secrets(self._nm_conn_path, on_cached_path_error)
+        else:
+            find_connection()
+
+    def _note_nm_secrets(self, cookie: str):
+        """Remember that NM holds secrets for us if it delivered a cookie."""
+        if cookie:
+            self._nm_has_secrets = True
+
+    def _call_nm_connection(self, conn_path, method_name, reply_handler, error_handler):
+        """Asynchronously call a Settings.Connection method on conn_path."""
+        try:
+            conn = self.connection.get_object(
+                NM_BUS_NAME, conn_path, introspect=False
+            )
+            getattr(conn, method_name)(
+                dbus_interface=NM_SETTINGS_CONNECTION_INTERFACE,
+                reply_handler=reply_handler,
+                error_handler=error_handler,
+                timeout=5,
+            )
+        except dbus.DBusException as e:
+            error_handler(e)
 
     @method(dbus_interface=NM_DBUS_INTERFACE, in_signature="a{sv}")
     def SetConfig(self, config: dict[str, Any]):
         """Called by helper script with general VPN config."""
-        logger.info("SetConfig called: %s", config)
         self.config = convert_dbus_types(config)
+        logger.info("SetConfig called (keys=%s)", sorted(self.config))
+        logger.debug("SetConfig config: %s", self.config)
 
         # Cache VPN server IP for _cleanup_stale_vpn_routes() to avoid
         # blocking DNS lookups on reconnect.
@@ -2685,7 +3218,9 @@ class PulseSSOPlugin(dbus.service.Object):
 
         This signals that the VPN tunnel is established.
         """
-        logger.info("SetIp4Config called: %s", config)
+        logger.info("SetIp4Config called (keys=%s)", sorted(map(str, config)))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("SetIp4Config config: %s", convert_dbus_types(config))
 
         # Reset failure counters on successful connection
         if self._auth_failure_count > 0:
@@ -2729,6 +3264,7 @@ class PulseSSOPlugin(dbus.service.Object):
                 self._consecutive_restart_failures,
             )
             self._consecutive_restart_failures = 0
+        self._reactivation_failures = 0
 
         # Reset system-readiness and broken-strategy tracking
         self._system_not_ready_count = 0
@@ -2742,7 +3278,7 @@ class PulseSSOPlugin(dbus.service.Object):
         # Emit signal to NetworkManager with raw D-Bus types (not converted)
         # The signal expects a{sv} so we pass the config as received
         self.Ip4Config(config)
-        self.StateChanged(ServiceState.Started)
+        self._emit_state(ServiceState.Started)
 
         logger.info("VPN connection established")
 
@@ -2779,7 +3315,6 @@ class PulseSSOPlugin(dbus.service.Object):
             )
 
     @method(dbus_interface=NM_DBUS_INTERFACE, in_signature="a{sv}")
-    @trace
     def SetIp6Config(self, config: dict[str, Any]):
         """Called by helper script with IPv6 configuration."""
         self.Ip6Config(config)
@@ -2789,7 +3324,7 @@ class PulseSSOPlugin(dbus.service.Object):
     def SetFailure(self, reason: str):
         """Called when VPN connection fails."""
         logger.error("VPN failure: %s", reason)
-        self.StateChanged(ServiceState.Stopped)
+        self._emit_state(ServiceState.Stopped)
 
     @method(dbus_interface=NM_DBUS_INTERFACE, in_signature="a{sa{sv}}")
     def NewSecrets(self, connection: dict[str, dict[str, Any]]):
@@ -2799,38 +3334,37 @@ class PulseSSOPlugin(dbus.service.Object):
         After SecretsRequired is emitted, NM runs the auth-dialog and
         sends the collected secrets here.
         """
-        connection = convert_dbus_types(connection)
-        logger.info("NewSecrets called with: %s", connection)
-
-        vpn_secrets = connection.get("vpn", {}).get("secrets", {})
+        # Only vpn.secrets is kept, so convert just that instead of the
+        # whole settings tree
+        vpn_secrets = dict(convert_dbus_types(
+            connection.get("vpn", _NO_SETTINGS).get("secrets", _NO_SETTINGS)
+        ))
+        gateway, cookie, _, _ = extract_vpn_fields(connection)
+        self._note_nm_secrets(cookie)
+        logger.info(
+            "NewSecrets called (gateway=%s, secrets=%s)",
+            gateway or None, sorted(vpn_secrets),
+        )
 
         # If no cookie provided (e.g., KDE plasma-nm sends empty secrets),
         # trigger direct auth instead of failing
-        if not vpn_secrets.get("cookie"):
+        if not cookie:
             logger.info("NewSecrets called with no cookie, triggering direct auth")
 
-            # Extract gateway from connection or pending_connection
-            vpn_data = connection.get("vpn", {}).get("data", {})
-            gateway = vpn_data.get("gateway", "")
+            # Gateway from connection, else from pending_connection
             if not gateway and self.pending_connection:
-                gateway = (
-                    self.pending_connection.get("vpn", {})
-                    .get("data", {})
-                    .get("gateway", "")
-                )
+                gateway = extract_vpn_fields(self.pending_connection)[0]
 
             if not gateway:
                 logger.error("No gateway available for direct auth")
-                self.StateChanged(ServiceState.Stopped)
+                self._emit_state(ServiceState.Stopped)
                 self.Failure("No VPN gateway configured")
                 return
 
-            # Ensure gateway has https:// prefix
-            if not gateway.startswith("http://") and not gateway.startswith("https://"):
-                gateway = f"https://{gateway}"
+            gateway = ensure_https(gateway)
 
             self.gateway = gateway
-            self._reconnection_pending = True
+            self._set_phase(PluginPhase.Reauthenticating)
             self._reconnection_retry_count = 0
             self._schedule_direct_auth(0)
             return
@@ -2873,7 +3407,7 @@ class PulseSSOPlugin(dbus.service.Object):
     @dbus_signal(dbus_interface=NM_DBUS_INTERFACE, signature="a{sv}")
     def Ip4Config(self, ip4config: dict[str, Any]):
         """Emitted with IPv4 configuration."""
-        logger.info("Ip4Config signal: %s", ip4config)
+        pass
 
     @dbus_signal(dbus_interface=NM_DBUS_INTERFACE, signature="a{sv}")
     def Ip6Config(self, ip6config: dict[str, Any]):
@@ -2895,6 +3429,10 @@ def run(args: Namespace):
     """Main entry point - setup D-Bus and run event loop."""
     dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
 
+    # Lets the openconnect helper script find our D-Bus service. Set once
+    # here; every openconnect we spawn inherits it.
+    os.environ["NM_DBUS_SERVICE_PULSE_SSO"] = NM_DBUS_SERVICE
+
     bus = dbus.SystemBus()
     bus_name = dbus.service.BusName(args.bus_name, bus)
 
@@ -2908,13 +3446,25 @@ def run(args: Namespace):
         helper_script=args.helper_script,
     )
 
-    # Handle termination signals
-    def handle_signal(signum, frame):
+    # Handle termination signals. GLib's unix signal sources dispatch from
+    # the main loop itself, so a signal wakes loop.run() immediately instead
+    # of waiting for the interpreter to regain control between GLib
+    # callbacks.
+    def handle_signal(signum):
         logger.info("Received signal %d, shutting down", signum)
         loop.quit()
+        return True
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        GLib.unix_signal_add(GLib.PRIORITY_HIGH, signum, handle_signal, signum)
+
+    # Re-read the config file; the new settings apply from the next (re)connect
+    def handle_reload():
+        logger.info("Received SIGHUP, reloading %s", CONFIG_PATH)
+        plugin._reload_config()
+        return True
 
-    signal.signal(signal.SIGTERM, handle_signal)
-    signal.signal(signal.SIGINT, handle_signal)
+    GLib.unix_signal_add(GLib.PRIORITY_HIGH, signal.SIGHUP, handle_reload)
 
     logger.info("Starting %s D-Bus service", args.bus_name)
     loop.run()